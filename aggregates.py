@@ -0,0 +1,148 @@
+"""
+Per-column daily aggregates computed once per upload.
+
+The charts and the solar check both need daily totals of hourly columns. Rather
+than calling ``resample('D').sum()`` and ``ewm`` per column on every rerun,
+the daily sum, daily count and EMA of every numeric column are computed in one
+pass over the 2-D value array right after prepare_dataframe.
+"""
+import numpy as np
+import pandas as pd
+
+EMA_SPAN = 7
+COLUMN_BLOCK = 512
+
+
+class DailyAggregates:
+    """Daily sum, count and EMA tables for a set of columns."""
+
+    def __init__(self, index, columns, sums, counts, ema):
+        """
+        Initialize the aggregate tables.
+
+        Args:
+            index: Daily DatetimeIndex
+            columns: Column names
+            sums: Array of daily sums, shape (days, columns)
+            counts: Array of non-null hourly counts, shape (days, columns)
+            ema: Array of EMA of daily sums, shape (days, columns)
+        """
+        self.index = index
+        self.columns = pd.Index(columns)
+        self.sums = sums
+        self.counts = counts
+        self.ema = ema
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    @property
+    def nbytes(self):
+        return self.sums.nbytes + self.counts.nbytes + self.ema.nbytes + self.index.nbytes
+
+    def daily_sum(self, column):
+        """Return the daily totals of a column as a Series."""
+        return pd.Series(self.sums[:, self.columns.get_loc(column)], index=self.index, name=column)
+
+    def daily_count(self, column):
+        """Return the number of non-null hours per day of a column as a Series."""
+        return pd.Series(self.counts[:, self.columns.get_loc(column)], index=self.index, name=column)
+
+    def daily_ema(self, column):
+        """Return the EMA of the daily totals of a column as a Series."""
+        return pd.Series(self.ema[:, self.columns.get_loc(column)], index=self.index, name=column)
+
+    def daily(self, column):
+        """
+        Return the daily aggregates of a column.
+
+        Args:
+            column: Column name
+
+        Returns:
+            Dataframe with 'sum', 'count' and 'ema' columns indexed by day
+        """
+        loc = self.columns.get_loc(column)
+        return pd.DataFrame({
+            'sum': self.sums[:, loc],
+            'count': self.counts[:, loc],
+            'ema': self.ema[:, loc],
+        }, index=self.index)
+
+    def last_day_sums(self, columns):
+        """
+        Return the totals of the last day for several columns.
+
+        Args:
+            columns: Column names
+
+        Returns:
+            Array of last-day totals
+        """
+        if len(self.index) == 0:
+            return np.full(len(columns), np.nan)
+        return self.sums[-1, self.columns.get_indexer(columns)]
+
+
+def ema_rows(values, span=EMA_SPAN):
+    """
+    Exponential moving average down the rows of a 2-D array.
+
+    Matches ``ewm(span=span, adjust=False).mean()`` for data without NaN.
+
+    Args:
+        values: Array of shape (rows, columns)
+        span: EMA span
+
+    Returns:
+        Array of the same shape
+    """
+    alpha = 2.0 / (span + 1.0)
+    ema = np.empty_like(values)
+    if len(values) == 0:
+        return ema
+    ema[0] = values[0]
+    for i in range(1, len(values)):
+        ema[i] = ema[i - 1] + alpha * (values[i] - ema[i - 1])
+    return ema
+
+
+def compute_daily_aggregates(df, span=EMA_SPAN):
+    """
+    Compute daily sums, counts and EMA for all numeric columns.
+
+    Args:
+        df: Hourly dataframe with datetime index
+        span: EMA span in days
+
+    Returns:
+        DailyAggregates instance
+    """
+    df = df.select_dtypes(include='number')
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    n_columns = df.shape[1]
+
+    if len(df.index) == 0:
+        empty = np.empty((0, n_columns))
+        return DailyAggregates(pd.DatetimeIndex([], freq='D'), df.columns, empty,
+                               empty.astype(np.int32), empty)
+
+    days = df.index.normalize()
+    day_index = pd.date_range(days[0], days[-1], freq='D')
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    positions = day_index.get_indexer(days[starts])
+
+    sums = np.zeros((len(day_index), n_columns))
+    counts = np.zeros((len(day_index), n_columns), dtype=np.int32)
+    for block in range(0, n_columns, COLUMN_BLOCK):
+        values = df.iloc[:, block:block + COLUMN_BLOCK].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        sums[positions, block:block + COLUMN_BLOCK] = np.add.reduceat(
+            np.where(valid, values, 0.0), starts, axis=0
+        )
+        counts[positions, block:block + COLUMN_BLOCK] = np.add.reduceat(
+            valid, starts, axis=0, dtype=np.int32
+        )
+
+    return DailyAggregates(day_index, df.columns, sums, counts, ema_rows(sums, span))
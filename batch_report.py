@@ -0,0 +1,262 @@
+"""
+Headless batch report over a directory of sites files and daily exports.
+
+Every *_MMDDYYYY.csv export is paired with the sites JSON file whose name
+prefixes it (or with the only sites file in the directory), prepared for its
+date window and checked for low solar totals and missing data. Exports are
+processed on a process pool and the findings of all of them are written to one
+consolidated CSV, JSON or HTML report.
+
+Usage:
+    python batch_report.py DIRECTORY [-o report.html] [--workers N]
+    python batch_report.py DIRECTORY --throughput 1 4 8
+"""
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from gap_index import build_gap_index
+from ingest import read_data_file
+from site_catalog import SiteCatalog
+from solar_check import SolarHealthCheck, get_configured_thresholds
+from utils import prepare_dataframe
+
+EXPORT_PATTERN = re.compile(r'_(\d{8})(?:_[^_]*)?\.csv$')
+REPORT_FORMATS = ('csv', 'json', 'html')
+SUMMARY_COLUMNS = ['site', 'end_date', 'file', 'rows', 'columns', 'missing_hours',
+                   'columns_with_gaps', 'solar_issues', 'seconds', 'error']
+COUNT_COLUMNS = ['rows', 'columns', 'missing_hours', 'columns_with_gaps', 'solar_issues']
+ISSUE_COLUMNS = ['site', 'end_date', 'kind', 'data_point', 'description', 'detail']
+
+# Per-process cache of sites files, keyed by path
+_catalogs = {}
+
+
+def find_jobs(directory):
+    """
+    Pair the exports of a directory with their sites files.
+
+    Args:
+        directory: Directory holding sites JSON files and CSV exports
+
+    Returns:
+        List of (site_name, sites_path, csv_path, end_date_str) tuples, sorted
+        by site and date
+    """
+    names = sorted(os.listdir(directory))
+    sites_files = {os.path.splitext(name)[0].lower(): os.path.join(directory, name)
+                   for name in names if name.lower().endswith('.json')}
+    jobs = []
+    for name in names:
+        match = EXPORT_PATTERN.search(name)
+        if not match:
+            continue
+        stems = [stem for stem in sites_files if name.lower().startswith(stem)]
+        if stems:
+            stem = max(stems, key=len)
+        elif len(sites_files) == 1:
+            stem = next(iter(sites_files))
+        else:
+            continue
+        jobs.append((stem.capitalize(), sites_files[stem], os.path.join(directory, name),
+                     match.group(1)))
+    jobs.sort(key=lambda job: (job[0], job[3][4:], job[3][:4]))
+    return jobs
+
+
+def _load_catalog(sites_path):
+    """Load the catalog and solar check of a sites file once per process."""
+    entry = _catalogs.get(sites_path)
+    if entry is None:
+        catalog = SiteCatalog.from_sites(pd.read_json(sites_path))
+        entry = (catalog, SolarHealthCheck.from_catalog(catalog, get_configured_thresholds()))
+        _catalogs[sites_path] = entry
+    return entry
+
+
+def _describe(catalog, column):
+    location = catalog.locate(column)
+    return f"{location[0]} / {location[2]}" if location else ""
+
+
+def process_export(job):
+    """
+    Prepare one export and collect its solar and missing-data findings.
+
+    Args:
+        job: (site_name, sites_path, csv_path, end_date_str) tuple
+
+    Returns:
+        Tuple of (summary dictionary, list of issue dictionaries)
+    """
+    site_name, sites_path, csv_path, end_date_str = job
+    started = time.perf_counter()
+    summary = dict.fromkeys(SUMMARY_COLUMNS)
+    summary.update(site=site_name, end_date=end_date_str, file=os.path.basename(csv_path))
+    issues = []
+    try:
+        catalog, solar_check = _load_catalog(sites_path)
+        with open(csv_path, 'rb') as f:
+            df = prepare_dataframe(read_data_file(f.read()), end_date_str)
+
+        totals = solar_check.last_day_totals(df)
+        for i in np.flatnonzero(totals <= solar_check.thresholds):
+            point = solar_check.points[i]
+            issues.append(dict(site=site_name, end_date=end_date_str, kind='solar',
+                               data_point=point['index'],
+                               description=f"{point['site']} / {point['name']}",
+                               detail=f"last day total {totals[i]:g}"))
+
+        gap_index = build_gap_index(df)
+        gapped = gap_index.missing_counts[gap_index.missing_counts > 0]
+        for column, hours in gapped.items():
+            gaps = gap_index.gaps(column)
+            issues.append(dict(site=site_name, end_date=end_date_str, kind='missing',
+                               data_point=column, description=_describe(catalog, column),
+                               detail=f"{hours} h in {len(gaps)} gap(s) from "
+                                      f"{gaps['start'].iloc[0]:%m/%d/%y %I:%M %p}"))
+
+        summary.update(rows=len(df.index), columns=len(df.columns),
+                       missing_hours=int(gapped.sum()), columns_with_gaps=len(gapped),
+                       solar_issues=sum(issue['kind'] == 'solar' for issue in issues))
+    except Exception as e:
+        summary['error'] = f"{type(e).__name__}: {e}"
+    summary['seconds'] = round(time.perf_counter() - started, 4)
+    return summary, issues
+
+
+def run_batch(jobs, workers=1):
+    """
+    Process exports, in parallel when more than one worker is requested.
+
+    Args:
+        jobs: Jobs as returned by find_jobs
+        workers: Number of worker processes
+
+    Returns:
+        Tuple of (summary dataframe, issues dataframe)
+    """
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(jobs) // (4 * workers))
+            results = list(pool.map(process_export, jobs, chunksize=chunksize))
+    else:
+        results = [process_export(job) for job in jobs]
+    summary = pd.DataFrame([result[0] for result in results], columns=SUMMARY_COLUMNS)
+    summary = summary.astype({column: 'Int64' for column in COUNT_COLUMNS})
+    issues = pd.DataFrame([issue for result in results for issue in result[1]],
+                          columns=ISSUE_COLUMNS)
+    return summary, issues
+
+
+def write_report(summary, issues, path):
+    """
+    Write the consolidated report, choosing the format from the extension.
+
+    A CSV report holds the summary; the issues are written next to it with an
+    _issues suffix.
+
+    Args:
+        summary: Summary dataframe, one row per export
+        issues: Issues dataframe, one row per finding
+        path: Output path ending in .csv, .json or .html
+
+    Returns:
+        List of written paths
+    """
+    root, ext = os.path.splitext(path)
+    report_format = ext.lstrip('.').lower()
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {ext}")
+
+    if report_format == 'csv':
+        issues_path = f"{root}_issues{ext}"
+        summary.to_csv(path, index=False)
+        issues.to_csv(issues_path, index=False)
+        return [path, issues_path]
+
+    if report_format == 'json':
+        document = {
+            'summary': json.loads(summary.to_json(orient='records')),
+            'issues': json.loads(issues.to_json(orient='records'))
+        }
+        with open(path, 'w') as f:
+            json.dump(document, f, indent=2)
+        return [path]
+
+    with open(path, 'w') as f:
+        f.write("<html><head><meta charset='utf-8'><title>Dashboard batch report</title>"
+                "<style>table{border-collapse:collapse}td,th{padding:2px 8px;"
+                "border:1px solid #ccc}</style></head><body>\n")
+        f.write("<h2>Exports</h2>\n")
+        f.write(summary.to_html(index=False, na_rep=''))
+        for kind, title in (('solar', 'Check data point(s)'), ('missing', 'Missing data')):
+            f.write(f"\n<h2>{title}</h2>\n")
+            f.write(issues[issues['kind'] == kind].drop(columns='kind').to_html(index=False))
+        f.write("\n</body></html>\n")
+    return [path]
+
+
+def _total_megabytes(jobs):
+    return sum(os.path.getsize(job[2]) for job in jobs) / 1024 ** 2
+
+
+def measure_throughput(jobs, worker_counts):
+    """
+    Time the batch for several worker counts.
+
+    Args:
+        jobs: Jobs as returned by find_jobs
+        worker_counts: Numbers of worker processes to try
+
+    Returns:
+        Dataframe with workers, seconds, exports_per_s and mb_per_s columns
+    """
+    megabytes = _total_megabytes(jobs)
+    rows = []
+    for workers in worker_counts:
+        started = time.perf_counter()
+        run_batch(jobs, workers)
+        seconds = time.perf_counter() - started
+        rows.append(dict(workers=workers, seconds=round(seconds, 3),
+                         exports_per_s=round(len(jobs) / seconds, 2),
+                         mb_per_s=round(megabytes / seconds, 2)))
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('-o', '--output', default='report.html',
+                        help="Report path ending in .csv, .json or .html")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--throughput', type=int, nargs='*', metavar='WORKERS',
+                        help="Only measure throughput, by default for 1, 4 and all CPUs")
+    args = parser.parse_args()
+
+    jobs = find_jobs(args.directory)
+    if not jobs:
+        parser.error(f"no *_MMDDYYYY.csv exports with a sites file in {args.directory}")
+
+    if args.throughput is not None:
+        worker_counts = args.throughput or sorted({1, 4, os.cpu_count() or 1})
+        print(measure_throughput(jobs, worker_counts).to_string(index=False))
+        return
+
+    started = time.perf_counter()
+    summary, issues = run_batch(jobs, args.workers)
+    seconds = time.perf_counter() - started
+    for path in write_report(summary, issues, args.output):
+        print(f"Wrote {path}")
+    print(f"{len(jobs)} exports, {len(issues)} findings, {int(summary['error'].notna().sum())} "
+          f"errors in {seconds:.2f}s with {args.workers} worker(s) "
+          f"({len(jobs) / seconds:.2f} exports/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the dashboard hot paths.
+
+Run from the repository root, e.g. ``python -m benchmarks.bench_ingest``, or
+``python -m benchmarks.suite`` for every hot path on synthetic sites.
+"""
@@ -0,0 +1,97 @@
+"""
+Benchmark memory and accuracy of the compact float32 frame against float64.
+
+Memory is the size of the prepared frame, the peak allocated while parsing
+and preparing it (dominated by copies of the CSV text) and the peak of the
+prepare step alone. Accuracy compares values, daily totals, the solar check,
+outlier counts and missing data of both representations.
+
+Usage:
+    python -m benchmarks.bench_compact [--points-per-type 10 40 170] [--sites 10]
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+
+from aggregates import compute_daily_aggregates
+from compact import COMPACT_DTYPE, prepare_compact
+from ingest import read_data_file
+from outliers import OutlierEngine
+from solar_check import SolarHealthCheck
+from utils import prepare_dataframe, get_missing_data_timestamps
+from benchmarks.synthetic import make_dataset
+
+END_DATE = '04012025'
+
+
+def measure(func, *args):
+    """Return (result, seconds, peak allocated bytes) of one call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def load_full(raw):
+    return prepare_dataframe(read_data_file(raw), END_DATE)
+
+
+def load_compact(raw):
+    return prepare_compact(read_data_file(raw, dtype=COMPACT_DTYPE), END_DATE)
+
+
+def compare(sites, df, df_compact):
+    """Return accuracy figures of df_compact against df."""
+    full = df.to_numpy()
+    compact = df_compact.to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rel = np.abs(compact - full) / np.abs(full)
+    daily = compute_daily_aggregates(df).sums
+    daily_compact = compute_daily_aggregates(df_compact).sums
+    check = SolarHealthCheck.from_sites(sites)
+    counts = OutlierEngine(df).flagged_counts()
+    counts_compact = OutlierEngine(df_compact).flagged_counts()
+    column = df.columns[0]
+    return dict(
+        max_rel_value=np.nanmax(rel[np.isfinite(rel)]) if np.isfinite(rel).any() else 0.0,
+        max_rel_daily=np.nanmax(np.abs(daily_compact - daily) / np.maximum(np.abs(daily), 1e-12)),
+        solar_same=check.run(df) == check.run(df_compact),
+        outlier_diff=int(np.abs(counts - counts_compact.reindex(counts.index)).sum()),
+        missing_same=get_missing_data_timestamps(df, column).equals(
+            get_missing_data_timestamps(df_compact, column)
+        ),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points-per-type', type=int, nargs='+', default=[10, 40, 170])
+    parser.add_argument('--sites', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'cols':>6} {'f64 MB':>8} {'f32 MB':>8} {'f64 peak':>9} {'f32 peak':>9} "
+          f"{'f64 prep':>9} {'f32 prep':>9} {'f64 s':>7} {'f32 s':>7} {'rel err':>9} "
+          f"{'daily err':>9} {'solar':>6} {'outl diff':>9} {'gaps':>5}")
+    for points_per_type in args.points_per_type:
+        sites, raw = make_dataset(args.sites, points_per_type, END_DATE)
+        df, t_full, peak_full = measure(load_full, raw)
+        df_compact, t_compact, peak_compact = measure(load_compact, raw)
+        _, _, prep_full = measure(prepare_dataframe, read_data_file(raw), END_DATE)
+        _, _, prep_compact = measure(prepare_compact, read_data_file(raw, dtype=COMPACT_DTYPE),
+                                     END_DATE)
+        acc = compare(sites, df, df_compact)
+        mb = 1024 ** 2
+        print(f"{df.shape[1]:>6} {df.memory_usage().sum() / mb:>8.1f} "
+              f"{df_compact.memory_usage().sum() / mb:>8.1f} {peak_full / mb:>9.1f} "
+              f"{peak_compact / mb:>9.1f} {prep_full / mb:>9.1f} {prep_compact / mb:>9.1f} "
+              f"{t_full:>7.3f} {t_compact:>7.3f} "
+              f"{acc['max_rel_value']:>9.1e} {acc['max_rel_daily']:>9.1e} "
+              f"{str(acc['solar_same']):>6} {acc['outlier_diff']:>9} {str(acc['missing_same']):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark figure build + serialize time of the fast and validated chart paths.
+
+Serialization mirrors st.plotly_chart: ``fig.to_dict()`` followed by
+``plotly.io.to_json(..., validate=False)``.
+
+Usage:
+    python -m benchmarks.bench_figures [--points 1000 10000 100000 500000]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+import plotly.io
+
+from plotting import create_single_data_chart, create_multi_series_chart
+from benchmarks.bench_ingest import time_call
+
+
+def make_hourly_frame(n_points, seed=0):
+    """Build an hourly frame with two columns and a few gaps."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2000-01-01', periods=n_points, freq='h')
+    values = rng.random((n_points, 2)) * 100
+    values[rng.random(values.shape) < 0.01] = np.nan
+    return pd.DataFrame(values, index=index, columns=['_1_1', '_2_1'])
+
+
+def build_and_serialize(build, *args, **kwargs):
+    """Build a figure and serialize it the way Streamlit does."""
+    fig = build(*args, **kwargs)
+    return plotly.io.to_json(fig.to_dict(), validate=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 10000, 100000, 500000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # Two series on their own y-axes, as in the two-point comparison
+    series = [dict(data_desc='A', unit='kWh', axis='A'), dict(data_desc='B', unit='kWh', axis='B')]
+    print(f"{'points':>8} {'chart':>10} {'go.Figure':>10} {'fast':>10} {'speedup':>8} {'MB':>6}")
+    for n_points in args.points:
+        df = make_hourly_frame(n_points)
+        start_dt, end_dt = df.index[0], df.index[-1]
+        cases = {
+            'single': (create_single_data_chart, (df, '_1_1', 'kWh', start_dt, end_dt)),
+            'compare': (create_multi_series_chart, (df.index, df.to_numpy(), series,
+                                                    start_dt, end_dt)),
+        }
+        for name, (build, build_args) in cases.items():
+            t_slow, _ = time_call(build_and_serialize, build, *build_args, fast=False,
+                                  repeat=args.repeat)
+            t_fast, spec = time_call(build_and_serialize, build, *build_args, fast=True,
+                                     repeat=args.repeat)
+            print(f"{n_points:>8} {name:>10} {t_slow:>9.3f}s {t_fast:>9.3f}s "
+                  f"{t_slow / t_fast:>7.1f}x {len(spec) / 1e6:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark the fast CSV ingest against the original Python-engine reader.
+
+Usage:
+    python -m benchmarks.bench_ingest [--columns 100 1000 5000] [--days 90]
+"""
+import argparse
+import io
+import time
+import numpy as np
+import pandas as pd
+
+from ingest import read_data_file, read_data_file_legacy
+
+
+def make_export(n_columns, days=90, seed=0):
+    """
+    Build a synthetic hourly CSV export with units row and footer.
+
+    Args:
+        n_columns: Number of meter columns
+        days: Number of days of hourly data
+        seed: Random seed
+
+    Returns:
+        CSV content as bytes
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2025-01-01', periods=days * 24, freq='h', name='time')
+    columns = [f"_{1000 + i}_{1 if i % 4 else 2}" for i in range(n_columns)]
+    values = rng.random((len(index), n_columns)) * 100
+    values[rng.random(values.shape) < 0.01] = np.nan
+    df = pd.DataFrame(values.round(3), index=index, columns=columns)
+
+    buf = io.StringIO()
+    buf.write(','.join(['time'] + columns) + '\n')
+    buf.write(','.join([''] + ['kWh'] * n_columns) + '\n')
+    df.to_csv(buf, header=False, date_format='%Y-%m-%d %H:%M:%S')
+    buf.write('Total' + ',' * n_columns + '\n')
+    return buf.getvalue().encode()
+
+
+def time_call(func, *args, repeat=3, **kwargs):
+    """Return the best wall time in seconds and the last result of func."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--columns', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'columns':>8} {'python':>10} {'fast':>10} {'fast f32':>10} {'speedup':>8}")
+    for n_columns in args.columns:
+        raw = make_export(n_columns, args.days)
+        t_legacy, df_legacy = time_call(read_data_file_legacy, raw, repeat=args.repeat)
+        t_fast, df_fast = time_call(read_data_file, raw, repeat=args.repeat)
+        t_f32, _ = time_call(read_data_file, raw, dtype=np.float32, repeat=args.repeat)
+        pd.testing.assert_frame_equal(df_legacy, df_fast, check_freq=False)
+        print(f"{n_columns:>8} {t_legacy:>9.3f}s {t_fast:>9.3f}s {t_f32:>9.3f}s {t_legacy / t_fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
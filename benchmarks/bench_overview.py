@@ -0,0 +1,66 @@
+"""
+Benchmark the site overview heatmap against its one-second budget.
+
+Each case computes the daily totals, completeness and outlier counts of every
+column, builds the heatmap of each metric and serializes it the way
+st.plotly_chart does. The quantile fence of the default outlier method is
+also timed against np.nanquantile.
+
+Usage:
+    python -m benchmarks.bench_overview [--columns 500 5000] [--days 90]
+"""
+import argparse
+import warnings
+import numpy as np
+import plotly.io as pio
+
+from outliers import nan_quantiles
+from overview import OVERVIEW_METRICS, compute_site_overview
+from plotting import create_overview_heatmap
+from benchmarks.bench_ingest import time_call
+from benchmarks.synthetic import make_frame
+
+END_DATE = '04012025'
+WINDOW_DAYS = 59
+
+
+def nanquantile(values, quantiles):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanquantile(values, quantiles, axis=0, keepdims=True)
+
+
+def render(overview, metric):
+    """Build and serialize the heatmap of one metric."""
+    order = overview.worst_first(metric)
+    fig = create_overview_heatmap(overview.index, list(overview.columns[order]),
+                                  overview.table(metric)[order], OVERVIEW_METRICS[metric])
+    return pio.to_json(fig.to_dict(), validate=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--columns', type=int, nargs='+', default=[500, 5000])
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'columns':>8} {'nanquant':>9} {'sorted':>9} {'compute':>9} "
+          + ' '.join(f"{metric[:12]:>12}" for metric in OVERVIEW_METRICS))
+    for n_columns in args.columns:
+        columns = [f'_{1000 + i}_1' for i in range(n_columns)]
+        df = make_frame(columns, END_DATE, history_days=max(args.days - WINDOW_DAYS, 0))
+        values = df.to_numpy()
+
+        t_numpy, expected = time_call(nanquantile, values, [0.1, 0.9], repeat=args.repeat)
+        t_sorted, result = time_call(nan_quantiles, values, [0.1, 0.9], repeat=args.repeat)
+        assert all(np.array_equal(a, b, equal_nan=True) for a, b in zip(expected, result))
+        t_compute, overview = time_call(compute_site_overview, df, repeat=args.repeat)
+        renders = [time_call(render, overview, metric, repeat=args.repeat)[0]
+                   for metric in OVERVIEW_METRICS]
+        print(f"{n_columns:>8} {t_numpy:>8.3f}s {t_sorted:>8.3f}s {t_compute:>8.3f}s "
+              + ' '.join(f"{t:>11.3f}s" for t in renders))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark time-range selection by binary search against boolean masks.
+
+Each case selects a date range from the hourly index, one value column and
+the matching daily totals, the way the chart builders do.
+
+Usage:
+    python -m benchmarks.bench_slicing [--points 2000 20000 200000 2000000]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+from utils import get_range_slice
+from benchmarks.bench_figures import make_hourly_frame
+from benchmarks.bench_ingest import time_call
+
+
+def select_mask(df, daily, start_dt, end_dt):
+    """Select with boolean masks over the full indexes."""
+    time_range = (df.index >= start_dt) & (df.index <= end_dt)
+    date_range = (daily.index >= start_dt) & (daily.index <= end_dt)
+    return df.index[time_range], df['_1_1'][time_range], daily.values[date_range]
+
+
+def select_slice(df, daily, start_dt, end_dt):
+    """Select with positional slices found by binary search."""
+    rows = get_range_slice(df.index, start_dt, end_dt)
+    days = get_range_slice(daily.index, start_dt, end_dt)
+    return df.index[rows], df['_1_1'].iloc[rows], daily.values[days]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[2000, 20000, 200000, 2000000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'mask':>10} {'slice':>10} {'speedup':>8}")
+    for n_points in args.points:
+        df = make_hourly_frame(n_points)
+        daily = df['_1_1'].resample('D').sum()
+        # Select the middle half, like a narrowed date picker
+        start_dt = df.index[n_points // 4].normalize()
+        end_dt = df.index[3 * n_points // 4].normalize() + pd.Timedelta(hours=23)
+
+        t_mask, expected = time_call(select_mask, df, daily, start_dt, end_dt, repeat=args.repeat)
+        t_slice, result = time_call(select_slice, df, daily, start_dt, end_dt, repeat=args.repeat)
+        assert expected[0].equals(result[0]) and expected[1].equals(result[1])
+        assert np.array_equal(expected[2], result[2])
+        print(f"{n_points:>8} {t_mask * 1e3:>8.3f}ms {t_slice * 1e3:>8.3f}ms "
+              f"{t_mask / t_slice:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
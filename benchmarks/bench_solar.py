@@ -0,0 +1,77 @@
+"""
+Benchmark the batch solar health check against the per-column loop.
+
+Usage:
+    python -m benchmarks.bench_solar [--points 10 100 1000 5000] [--days 90]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+from aggregates import compute_daily_aggregates
+from solar_check import SolarHealthCheck
+from utils import find_data_points
+from benchmarks.bench_ingest import time_call
+
+
+def make_solar_site(n_points, days=90, seed=0):
+    """
+    Build a sites dictionary and hourly frame with n_points solar meters.
+
+    Args:
+        n_points: Number of solar Energy data points
+        days: Number of days of hourly data
+        seed: Random seed
+
+    Returns:
+        Tuple of (sites_dict, dataframe)
+    """
+    rng = np.random.default_rng(seed)
+    columns = [f"_{5000 + i}_1" for i in range(n_points)]
+    sites_dict = {
+        f"Site {s}": {
+            "Energy": {f"Solar {i}": col for i, col in enumerate(columns) if i % 10 == s},
+        }
+        for s in range(10)
+    }
+    index = pd.date_range('2025-01-01', periods=days * 24, freq='h')
+    values = rng.random((len(index), n_points)) * 5
+    values[-24:, ::7] = 0.0
+    return sites_dict, pd.DataFrame(values, index=index, columns=columns)
+
+
+def legacy_check(sites_dict, df):
+    """Per-column implementation the batch check replaces."""
+    problematic_points = []
+    for s in find_data_points(sites_dict, "solar"):
+        if s["type"] == "Energy" and s["index"] in df.columns:
+            solar_daily_data = df[s["index"]].resample('D').sum()
+            if len(solar_daily_data) > 0 and solar_daily_data.iloc[-1] <= 10:
+                problematic_points.append(s)
+    return problematic_points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'loop':>10} {'batch':>10} {'batch+agg':>10} {'speedup':>8}")
+    for n_points in args.points:
+        sites_dict, df = make_solar_site(n_points, args.days)
+        check = SolarHealthCheck.from_sites(sites_dict)
+        aggregates = compute_daily_aggregates(df)
+
+        t_loop, expected = time_call(legacy_check, sites_dict, df, repeat=args.repeat)
+        t_batch, result = time_call(check.run, df, repeat=args.repeat)
+        t_agg, result_agg = time_call(check.run, df, aggregates, repeat=args.repeat)
+        key = lambda p: p["index"]
+        assert sorted(expected, key=key) == sorted(result, key=key) == sorted(result_agg, key=key)
+        print(f"{n_points:>8} {t_loop * 1e3:>8.2f}ms {t_batch * 1e3:>8.2f}ms "
+              f"{t_agg * 1e3:>8.2f}ms {t_loop / t_batch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Time the dashboard hot paths on synthetic sites of several sizes.
+
+Every case runs on the same synthetic export per size and reports its best
+wall time. Results can be written as JSON, with the library versions and git
+commit they were measured at, to track them across versions.
+
+Usage:
+    python -m benchmarks.suite [--sizes small medium large] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from aggregates import compute_daily_aggregates
+from gap_index import build_gap_index
+from ingest import read_data_file
+from outliers import OutlierEngine
+from overview import OVERVIEW_METRICS, DEFAULT_METRIC, compute_site_overview
+from plotting import (
+    create_single_data_chart, create_multi_series_chart, create_overview_heatmap,
+    get_target_points
+)
+from solar_check import SolarHealthCheck, check_solar_data_issues
+from utils import prepare_dataframe, filter_outliers, get_unit_from_data_point
+from benchmarks.bench_figures import build_and_serialize
+from benchmarks.bench_ingest import time_call
+from benchmarks.synthetic import make_dataset
+
+# Size name -> (sites, data points per site and data type)
+SIZES = {
+    'small': (1, 10),
+    'medium': (5, 40),
+    'large': (10, 170),
+}
+END_DATE = '04012025'
+COMPARE_SERIES = 10
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def environment():
+    """Return the versions and machine the results were measured with."""
+    versions = {'python': platform.python_version(), 'numpy': np.__version__,
+                'pandas': pd.__version__}
+    for module in ('pyarrow', 'plotly'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return dict(time=datetime.now().isoformat(timespec='seconds'), commit=_git_commit(),
+                machine=platform.machine(), cpus=os.cpu_count(), versions=versions)
+
+
+def make_cases(sites, raw):
+    """
+    Build the benchmark cases for one synthetic export.
+
+    Args:
+        sites: Sites dictionary
+        raw: CSV export as bytes
+
+    Returns:
+        Dictionary of case name -> (function, args)
+    """
+    df_raw = read_data_file(raw)
+    df = prepare_dataframe(df_raw, END_DATE)
+    column = df.columns[0]
+    columns = list(df.columns[:COMPARE_SERIES])
+    start_dt, end_dt = df.index[0], df.index[-1]
+    max_points = get_target_points(None)
+    check = SolarHealthCheck.from_sites(sites)
+    series = [dict(data_desc=col, unit=get_unit_from_data_point(col)) for col in columns]
+
+    def compare_chart():
+        values = OutlierEngine(df).filter_values(columns, False)
+        return build_and_serialize(create_multi_series_chart, df.index, values, series,
+                                   start_dt, end_dt, max_points)
+
+    def site_overview():
+        overview = compute_site_overview(df)
+        order = overview.worst_first()
+        return build_and_serialize(create_overview_heatmap, overview.index,
+                                   list(overview.columns[order]), overview.table()[order],
+                                   OVERVIEW_METRICS[DEFAULT_METRIC])
+
+    return {
+        'read_data_file': (read_data_file, (raw,)),
+        'prepare_dataframe': (prepare_dataframe, (df_raw, END_DATE)),
+        'filter_outliers': (filter_outliers, (df, column, False)),
+        'outlier_counts': (lambda: OutlierEngine(df).flagged_counts(), ()),
+        'daily_aggregates': (compute_daily_aggregates, (df,)),
+        'gap_index': (build_gap_index, (df,)),
+        'single_chart': (build_and_serialize, (create_single_data_chart, df, column,
+                                               get_unit_from_data_point(column), start_dt, end_dt,
+                                               None, max_points)),
+        'compare_chart': (compare_chart, ()),
+        'solar_check': (check.run, (df,)),
+        'solar_check_from_sites': (check_solar_data_issues, (sites, df)),
+        'site_overview': (site_overview, ()),
+    }
+
+
+def run_suite(sizes, repeat=3, cases=None):
+    """
+    Run the benchmark cases for each size.
+
+    Args:
+        sizes: Size names from SIZES
+        repeat: Number of timed runs per case
+        cases: Optional case names to run, all by default
+
+    Returns:
+        List of result dictionaries
+    """
+    results = []
+    for size in sizes:
+        n_sites, points_per_type = SIZES[size]
+        sites, raw = make_dataset(n_sites, points_per_type, END_DATE)
+        size_cases = make_cases(sites, raw)
+        n_columns = len(read_data_file(raw).columns)
+        for name, (func, args) in size_cases.items():
+            if cases and name not in cases:
+                continue
+            func(*args)  # warm up imports and caches outside the timed runs
+            best, _ = time_call(func, *args, repeat=repeat)
+            results.append(dict(size=size, columns=n_columns, csv_bytes=len(raw), case=name,
+                                best_s=round(best, 6), repeat=repeat))
+            print(f"{size:>8} {n_columns:>6} {name:>24} {best * 1e3:>10.2f}ms", flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(SIZES))
+    parser.add_argument('--cases', nargs='+', help="Only run these cases")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'cols':>6} {'case':>24} {'best':>12}")
+    results = run_suite(args.sizes, args.repeat, args.cases)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(dict(environment=environment(), results=results), f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
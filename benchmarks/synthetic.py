@@ -0,0 +1,194 @@
+"""
+Synthetic sites files and hourly exports for benchmarks.
+
+Sites follow the site -> data type -> description -> column layout of the
+sites JSON, with columns named _<entity>_<unit> so get_entity_id and
+get_unit_from_data_point resolve them. Exports carry the header, units row
+and footer of the real CSV exports and cover the window of get_time_range
+plus some history, with gaps, outlier spikes and a few dead solar meters.
+
+Usage:
+    python -m benchmarks.synthetic DIRECTORY [--sites 3] [--points-per-type 20]
+"""
+import argparse
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from utils import get_time_range, get_unit_from_data_point
+
+# Data type -> unit code of the column name (see get_unit_from_data_point)
+TYPE_UNITS = {'Energy': 1, 'Gas': 2, 'Water': 20}
+SOLAR_EVERY = 5
+
+
+def make_sites(n_sites, points_per_type, data_types=tuple(TYPE_UNITS), first_entity=1000):
+    """
+    Build a sites dictionary.
+
+    Every SOLAR_EVERY-th Energy point of a site is a solar meter.
+
+    Args:
+        n_sites: Number of sites
+        points_per_type: Data points per site and data type
+        data_types: Data types of every site
+        first_entity: Entity ID of the first column
+
+    Returns:
+        Dictionary of site -> data type -> description -> column
+    """
+    sites = {}
+    entity = first_entity
+    for s in range(n_sites):
+        site = {}
+        for data_type in data_types:
+            points = {}
+            for i in range(points_per_type):
+                solar = data_type == 'Energy' and i % SOLAR_EVERY == 0
+                desc = f"{'Solar' if solar else data_type} meter {i + 1}"
+                points[desc] = f"_{entity}_{TYPE_UNITS[data_type]}"
+                entity += 1
+            site[data_type] = points
+        sites[f"Site {s + 1}"] = site
+    return sites
+
+
+def site_columns(sites):
+    """Return the unique columns of a sites dictionary in file order."""
+    return list(dict.fromkeys(
+        column for site in sites.values() for points in site.values() for column in points.values()
+    ))
+
+
+def make_frame(columns, end_date_str, history_days=14, gap_rate=0.002, outlier_rate=0.001,
+               dead_solar=(), seed=0):
+    """
+    Build hourly meter readings for the window of an export.
+
+    Args:
+        columns: Column names
+        end_date_str: End date string in format MMDDYYYY
+        history_days: Extra days before the window start
+        gap_rate: Probability of a gap starting at any hour
+        outlier_rate: Probability of a spike at any hour
+        dead_solar: Columns reading zero on the last day
+        seed: Random seed
+
+    Returns:
+        Dataframe indexed by hour with one column per meter
+    """
+    rng = np.random.default_rng(seed)
+    start_time, end_time = get_time_range(end_date_str)
+    index = pd.date_range(pd.Timestamp(start_time) - pd.Timedelta(days=history_days), end_time,
+                          freq='h', name='time')
+    n_rows, n_columns = len(index), len(columns)
+
+    # Daily load shape around a per-meter base level, plus noise
+    base = rng.uniform(5, 100, n_columns)
+    shape = 1 + 0.5 * np.sin((index.hour.to_numpy() - 6) / 24 * 2 * np.pi)
+    values = base * shape[:, None] * rng.normal(1, 0.1, (n_rows, n_columns))
+
+    spikes = rng.random((n_rows, n_columns)) < outlier_rate
+    values[spikes] *= rng.uniform(10, 50, spikes.sum())
+
+    # Gaps of 1 to 48 hours
+    starts_rows, starts_cols = np.nonzero(rng.random((n_rows, n_columns)) < gap_rate)
+    for row, col, length in zip(starts_rows, starts_cols,
+                                rng.integers(1, 49, len(starts_rows))):
+        values[row:row + length, col] = np.nan
+
+    df = pd.DataFrame(values.round(3), index=index, columns=columns)
+    dead = [column for column in dead_solar if column in df.columns]
+    if dead:
+        df.loc[df.index >= index[-1].normalize(), dead] = 0.0
+    return df
+
+
+def to_export(df):
+    """
+    Serialize a frame as a CSV export with units row and footer.
+
+    Args:
+        df: Hourly dataframe with a time index
+
+    Returns:
+        CSV content as bytes
+    """
+    buf = io.StringIO()
+    buf.write(','.join(['time'] + list(df.columns)) + '\n')
+    buf.write(','.join([''] + [get_unit_from_data_point(col) for col in df.columns]) + '\n')
+    df.to_csv(buf, header=False, date_format='%Y-%m-%d %H:%M:%S')
+    buf.write('Total' + ',' * len(df.columns) + '\n')
+    return buf.getvalue().encode()
+
+
+def make_dataset(n_sites, points_per_type, end_date_str='04012025', seed=0, **frame_kwargs):
+    """
+    Build a sites dictionary and a matching export.
+
+    Args:
+        n_sites: Number of sites
+        points_per_type: Data points per site and data type
+        end_date_str: End date string in format MMDDYYYY
+        seed: Random seed
+        **frame_kwargs: Other arguments of make_frame
+
+    Returns:
+        Tuple of (sites dictionary, CSV content as bytes)
+    """
+    sites = make_sites(n_sites, points_per_type)
+    solar = [column for site in sites.values()
+             for desc, column in site.get('Energy', {}).items() if desc.startswith('Solar')]
+    frame_kwargs.setdefault('dead_solar', solar[::3])
+    df = make_frame(site_columns(sites), end_date_str, seed=seed, **frame_kwargs)
+    return sites, to_export(df)
+
+
+def write_dataset(directory, name, n_sites, points_per_type, end_dates=('04012025',), seed=0):
+    """
+    Write a sites file and one export per end date, named like real uploads.
+
+    Args:
+        directory: Output directory
+        name: Base name of the files (<name>.json, <name>_<MMDDYYYY>.csv)
+        n_sites: Number of sites
+        points_per_type: Data points per site and data type
+        end_dates: End date strings in format MMDDYYYY
+        seed: Random seed
+
+    Returns:
+        List of written paths
+    """
+    os.makedirs(directory, exist_ok=True)
+    sites_path = os.path.join(directory, f"{name}.json")
+    paths = [sites_path]
+    for i, end_date_str in enumerate(end_dates):
+        sites, raw = make_dataset(n_sites, points_per_type, end_date_str, seed + i)
+        csv_path = os.path.join(directory, f"{name}_{end_date_str}.csv")
+        with open(csv_path, 'wb') as f:
+            f.write(raw)
+        paths.append(csv_path)
+    with open(sites_path, 'w') as f:
+        json.dump(sites, f, indent=2)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('--name', default='main')
+    parser.add_argument('--sites', type=int, default=3)
+    parser.add_argument('--points-per-type', type=int, default=20)
+    parser.add_argument('--end-dates', nargs='+', default=['04012025'])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for path in write_dataset(args.directory, args.name, args.sites, args.points_per_type,
+                              args.end_dates, args.seed):
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
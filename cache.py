@@ -0,0 +1,326 @@
+"""
+In-memory caches that survive Streamlit reruns.
+
+Streamlit re-executes main.py on every widget interaction, but imported modules
+stay loaded, so module-level caches persist for the lifetime of the server
+process. Entries are keyed by a hash of the uploaded file content.
+"""
+import hashlib
+import io
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+from aggregates import compute_daily_aggregates
+from compact import COMPACT_DTYPE, compact_enabled, prepare_compact
+from gap_index import build_gap_index
+from incremental import rolling_store, incremental_enabled
+from ingest import read_upload_bytes, read_data_file
+from lazy_frame import LazyFrame, CsvColumnSource, StoreColumnSource, lazy_enabled
+from outliers import OutlierEngine
+from profiling import stage
+from registry import dataset_registry, read_only_frame
+from site_catalog import SiteCatalog
+from solar_check import SolarHealthCheck, get_configured_thresholds
+from store import get_store
+from utils import prepare_dataframe
+
+
+def content_key(raw, *parts):
+    """
+    Build a cache key from file content and extra key parts.
+
+    Args:
+        raw: File content as bytes
+        *parts: Additional values that change the cached result
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.blake2b(raw, digest_size=20)
+    for part in parts:
+        digest.update(b'\0' + str(part).encode())
+    return digest.hexdigest()
+
+
+def estimate_size(value):
+    """
+    Estimate the memory footprint of a cached value in bytes.
+
+    Args:
+        value: Cached object
+
+    Returns:
+        Approximate size in bytes
+    """
+    if hasattr(value, 'nbytes') and not isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.nbytes)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(estimate_size(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and total size."""
+
+    def __init__(self, max_entries=8, max_bytes=2 * 1024 ** 3):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries to keep
+            max_bytes: Maximum total estimated size of all entries
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, key, default=None):
+        """Return the cached value for key and mark it as recently used."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        """Store a value and evict least recently used entries over the limits."""
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._sizes.pop(key)
+                del self._entries[key]
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total_bytes += size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+            ):
+                old_key, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(old_key)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+
+sites_cache = LRUCache(max_entries=16, max_bytes=64 * 1024 ** 2)
+data_cache = LRUCache(max_entries=8, max_bytes=2 * 1024 ** 3)
+aggregates_cache = LRUCache(max_entries=8, max_bytes=256 * 1024 ** 2)
+gap_index_cache = LRUCache(max_entries=8, max_bytes=256 * 1024 ** 2)
+outlier_cache = LRUCache(max_entries=8, max_bytes=256 * 1024 ** 2)
+solar_check_cache = LRUCache(max_entries=16, max_bytes=16 * 1024 ** 2)
+
+
+def load_sites(site_info):
+    """
+    Load the sites table from an uploaded JSON file, reusing cached results.
+
+    Args:
+        site_info: Uploaded sites JSON file
+
+    Returns:
+        Sites dataframe
+    """
+    raw = read_upload_bytes(site_info)
+    key = content_key(raw)
+    sites = sites_cache.get(key)
+    if sites is None:
+        sites = pd.read_json(io.BytesIO(raw))
+        sites_cache.put(key, sites)
+    return sites
+
+
+def load_site_catalog(site_info):
+    """
+    Get the indexed SiteCatalog for an uploaded sites JSON file.
+
+    Args:
+        site_info: Uploaded sites JSON file
+
+    Returns:
+        SiteCatalog instance
+    """
+    key = content_key(read_upload_bytes(site_info), 'catalog')
+    catalog = sites_cache.get(key)
+    if catalog is None:
+        catalog = SiteCatalog.from_sites(load_sites(site_info))
+        sites_cache.put(key, catalog)
+    return catalog
+
+
+def load_solar_check(site_info, catalog):
+    """
+    Get the solar health check for a sites file, resolving its columns once.
+
+    Args:
+        site_info: Uploaded sites JSON file
+        catalog: SiteCatalog built from site_info
+
+    Returns:
+        SolarHealthCheck instance
+    """
+    thresholds = get_configured_thresholds()
+    key = content_key(read_upload_bytes(site_info), sorted(thresholds.items()))
+    solar_check = solar_check_cache.get(key)
+    if solar_check is None:
+        solar_check = SolarHealthCheck.from_catalog(catalog, thresholds)
+        solar_check_cache.put(key, solar_check)
+    return solar_check
+
+
+def _parse_and_prepare(raw, end_date_str, compact=False):
+    """Parse a CSV export and reindex it to its hourly window."""
+    if compact:
+        with stage('read_data_file'):
+            df = read_data_file(raw, dtype=COMPACT_DTYPE)
+        with stage('prepare_compact'):
+            return prepare_compact(df, end_date_str)
+    with stage('read_data_file'):
+        df = read_data_file(raw)
+    with stage('prepare_dataframe'):
+        return prepare_dataframe(df, end_date_str)
+
+
+def _load_prepared(raw, source_key, end_date_str, site_name, lazy, compact=False):
+    """Parse or reload a prepared frame, bypassing the in-memory cache."""
+    store = get_store() if site_name else None
+    stored = store is not None and store.exists(site_name, end_date_str) \
+        and store.content_key(site_name, end_date_str) == source_key
+
+    if lazy and store is None:
+        with stage('lazy_index'):
+            return LazyFrame(CsvColumnSource(raw), end_date_str)
+    if lazy:
+        if not stored:
+            store.save(site_name, end_date_str, _parse_and_prepare(raw, end_date_str, compact),
+                       source_key)
+        return LazyFrame(StoreColumnSource(store, site_name, end_date_str))
+    if stored:
+        with stage('store_load'):
+            return store.load(site_name, end_date_str)
+
+    if site_name and incremental_enabled():
+        with stage('incremental_update'):
+            df = rolling_store.update(site_name, raw, end_date_str,
+                                      COMPACT_DTYPE if compact else np.float64)
+    else:
+        df = _parse_and_prepare(raw, end_date_str, compact)
+    if store is not None:
+        with stage('store_save'):
+            store.save(site_name, end_date_str, df, source_key)
+    return df
+
+
+class Dataset:
+    """A prepared upload together with its per-upload indexes."""
+
+    def __init__(self, key, df, aggregates=None, gap_index=None, outliers=None):
+        """
+        Initialize the dataset.
+
+        Args:
+            key: Content hash of the upload and end date
+            df: Prepared dataframe or LazyFrame
+            aggregates: DailyAggregates of df, or None
+            gap_index: GapIndex of df, or None
+            outliers: OutlierEngine of df, or None
+        """
+        self.key = key
+        self.df = df
+        self.aggregates = aggregates
+        self.gap_index = gap_index
+        self.outliers = outliers
+
+
+def load_dataset(data_file, end_date_str, site_name=None, lazy=None, compact=None):
+    """
+    Load a prepared export together with its precomputed per-column indexes.
+
+    Datasets leased by open sessions are reused first, then the in-memory
+    caches are checked, then the on-disk store (if enabled
+    and site_name is given), and only then is the CSV parsed (incrementally
+    against the site's rolling buffer when DASHBOARD_INCREMENTAL is set).
+    Daily aggregates and the gap index are only precomputed for fully loaded
+    frames; for lazy frames they are None and callers compute what they need
+    for the columns they materialize.
+
+    Args:
+        data_file: Uploaded CSV file
+        end_date_str: End date string in format MMDDYYYY
+        site_name: Optional site name used as the on-disk store key
+        lazy: Return a LazyFrame instead of a dataframe; defaults to the
+            DASHBOARD_LAZY_COLUMNS setting
+        compact: Hold values as float32 in one block; defaults to the
+            DASHBOARD_COMPACT setting
+
+    Returns:
+        Dataset instance
+    """
+    if lazy is None:
+        lazy = lazy_enabled()
+    if compact is None:
+        compact = compact_enabled()
+    raw = read_upload_bytes(data_file)
+    # Compact frames hold float32 values, so they are cached and stored apart
+    source_key = content_key(raw, end_date_str, *(['compact'] if compact else []))
+    key = content_key(source_key.encode(), 'lazy' if lazy else 'full')
+    return dataset_registry.get_or_load(
+        key, lambda: _load_dataset(raw, key, source_key, end_date_str, site_name, lazy, compact)
+    )
+
+
+def _load_dataset(raw, key, source_key, end_date_str, site_name, lazy, compact):
+    """Load a dataset from the caches, the store or the CSV."""
+    df = data_cache.get(key)
+    if df is None:
+        df = _load_prepared(raw, source_key, end_date_str, site_name, lazy, compact)
+        if isinstance(df, pd.DataFrame):
+            # Cached and registered frames are the same read-only frame
+            df = read_only_frame(df)
+        data_cache.put(key, df)
+
+    outliers = outlier_cache.get(key)
+    if outliers is None:
+        outliers = OutlierEngine(df)
+        outlier_cache.put(key, outliers)
+    if lazy:
+        return Dataset(key, df, outliers=outliers)
+
+    aggregates = aggregates_cache.get(source_key)
+    if aggregates is None:
+        with stage('daily_aggregates'):
+            aggregates = compute_daily_aggregates(df)
+        aggregates_cache.put(source_key, aggregates)
+    gap_index = gap_index_cache.get(source_key)
+    if gap_index is None:
+        with stage('gap_index'):
+            gap_index = build_gap_index(df)
+        gap_index_cache.put(source_key, gap_index)
+    return Dataset(key, df, aggregates, gap_index, outliers)
@@ -0,0 +1,225 @@
+"""
+Static chart export without a running Streamlit server.
+
+Renders the single data point chart of every data point of an export, and a
+comparison chart per site and data type, into standalone HTML files that load
+one shared plotly.js bundle. Charts are rendered on a process pool; every
+worker loads and prepares the export once and then renders its share of the
+charts. PNG images are written as well when the optional kaleido package is
+installed.
+
+Usage:
+    python chart_export.py SITES_JSON EXPORT_CSV [-o charts] [--workers N]
+"""
+import argparse
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from aggregates import compute_daily_aggregates
+from batch_report import EXPORT_PATTERN
+from ingest import read_data_file
+from outliers import OutlierEngine, DEFAULT_METHOD
+from plotting import (
+    MAX_SERIES, create_single_data_chart, create_multi_series_chart, get_target_points
+)
+from site_catalog import SiteCatalog
+from utils import prepare_dataframe
+
+try:
+    import kaleido  # noqa: F401
+    PNG_AVAILABLE = True
+except ImportError:
+    PNG_AVAILABLE = False
+
+PLOTLYJS_NAME = 'plotly.min.js'
+
+# Export loaded once per worker process by _init_worker
+_state = {}
+
+
+def _slug(*parts):
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', '_'.join(str(part) for part in parts)).strip('_')
+
+
+def plan_charts(catalog, columns, compare=True):
+    """
+    List the charts to render for the columns present in an export.
+
+    Args:
+        catalog: SiteCatalog of the sites file
+        columns: Columns of the prepared export
+        compare: Also plan one comparison chart per site and data type,
+            split into groups of at most MAX_SERIES points
+
+    Returns:
+        List of (file name, title, list of (data_desc, column)) tuples
+    """
+    present = set(columns)
+    charts = []
+    for site in catalog.site_names():
+        for data_type in catalog.data_types(site):
+            points = [(desc, column) for desc, column in zip(catalog.data_descs(site, data_type),
+                                                             catalog.data_columns(site, data_type))
+                      if column in present]
+            for desc, column in points:
+                charts.append((_slug(site, data_type, desc, column), f"{site} / {desc}",
+                               [(desc, column)]))
+            if not compare or len(points) < 2:
+                continue
+            for group, start in enumerate(range(0, len(points), MAX_SERIES)):
+                charts.append((_slug('compare', site, data_type, group + 1),
+                               f"{site} / {data_type} ({group + 1})",
+                               points[start:start + MAX_SERIES]))
+    return charts
+
+
+def _load(sites_path, csv_path, end_date_str):
+    catalog = SiteCatalog.from_sites(pd.read_json(sites_path))
+    with open(csv_path, 'rb') as f:
+        df = prepare_dataframe(read_data_file(f.read()), end_date_str)
+    return catalog, df
+
+
+def _init_worker(sites_path, csv_path, end_date_str, options):
+    """Load and prepare the export once per worker process."""
+    catalog, df = _load(sites_path, csv_path, end_date_str)
+    _state.update(catalog=catalog, df=df, options=options, outliers=OutlierEngine(df),
+                  aggregates=compute_daily_aggregates(df))
+
+
+def render_chart(chart):
+    """
+    Render one planned chart to HTML (and PNG when available).
+
+    Args:
+        chart: (file name, title, list of (data_desc, column)) tuple
+
+    Returns:
+        List of written paths
+    """
+    name, title, points = chart
+    catalog, df, options = _state['catalog'], _state['df'], _state['options']
+    show_outliers = options['show_outliers']
+    start_dt, end_dt = df.index.min(), df.index.max()
+
+    if len(points) == 1:
+        desc, column = points[0]
+        df_plot = _state['outliers'].filter(column, show_outliers, options['outlier_method'])
+        daily = _state['aggregates'].daily(column) if show_outliers else None
+        fig = create_single_data_chart(df_plot, column, catalog.unit(column), start_dt, end_dt,
+                                       daily, options['max_points'])
+    else:
+        columns = list(dict.fromkeys(column for _, column in points))
+        values = _state['outliers'].filter_values(columns, show_outliers,
+                                                  options['outlier_method'])
+        positions = [columns.index(column) for _, column in points]
+        series = [dict(data_desc=desc, unit=catalog.unit(column)) for desc, column in points]
+        fig = create_multi_series_chart(df.index, values[:, positions], series, start_dt, end_dt,
+                                        options['max_points'])
+    fig.layout.title = dict(text=title)
+
+    path = os.path.join(options['output'], f"{name}.html")
+    with open(path, 'w') as f:
+        f.write(pio.to_html(fig, include_plotlyjs=PLOTLYJS_NAME, full_html=True, validate=False))
+    paths = [path]
+    if options['png'] and PNG_AVAILABLE:
+        png_path = os.path.join(options['output'], f"{name}.png")
+        pio.write_image(fig, png_path, validate=False)
+        paths.append(png_path)
+    return paths
+
+
+def _write_index(output, charts):
+    rows = '\n'.join(f"<li><a href='{name}.html'>{html.escape(title)}</a></li>"
+                     for name, title, _ in charts)
+    with open(os.path.join(output, 'index.html'), 'w') as f:
+        f.write(f"<html><head><meta charset='utf-8'><title>Charts</title></head>"
+                f"<body><ul>\n{rows}\n</ul></body></html>\n")
+
+
+def export_charts(sites_path, csv_path, output, workers=1, end_date_str=None, compare=True,
+                  show_outliers=True, outlier_method=DEFAULT_METHOD, max_points=None, png=False):
+    """
+    Render the charts of an export into a directory of static files.
+
+    Args:
+        sites_path: Sites JSON file
+        csv_path: CSV export named *_MMDDYYYY.csv
+        output: Output directory
+        workers: Number of worker processes
+        end_date_str: End date string in format MMDDYYYY; read from the
+            export's file name if omitted
+        compare: Also render comparison charts per site and data type
+        show_outliers: Boolean to show/hide outliers
+        outlier_method: Outlier method name used when hiding outliers
+        max_points: Downsample traces to about this many points, None for
+            full resolution
+        png: Also write PNG images (requires kaleido)
+
+    Returns:
+        List of written chart paths
+    """
+    if end_date_str is None:
+        match = EXPORT_PATTERN.search(os.path.basename(csv_path))
+        if not match:
+            raise ValueError("Could not extract date from filename. Expected format: *_MMDDYYYY.csv")
+        end_date_str = match.group(1)
+    if png and not PNG_AVAILABLE:
+        raise ImportError("PNG export requires the kaleido package")
+
+    os.makedirs(output, exist_ok=True)
+    with open(os.path.join(output, PLOTLYJS_NAME), 'w') as f:
+        f.write(get_plotlyjs())
+
+    catalog, df = _load(sites_path, csv_path, end_date_str)
+    charts = plan_charts(catalog, df.columns, compare)
+    _write_index(output, charts)
+    options = dict(output=output, show_outliers=show_outliers, outlier_method=outlier_method,
+                   max_points=max_points, png=png)
+    initargs = (sites_path, csv_path, end_date_str, options)
+
+    if workers > 1 and len(charts) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=initargs) as pool:
+            chunksize = max(1, len(charts) // (4 * workers))
+            results = list(pool.map(render_chart, charts, chunksize=chunksize))
+    else:
+        _init_worker(*initargs)
+        results = [render_chart(chart) for chart in charts]
+    return [path for paths in results for path in paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('sites')
+    parser.add_argument('export')
+    parser.add_argument('-o', '--output', default='charts')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--no-compare', action='store_true',
+                        help="Skip the per data type comparison charts")
+    parser.add_argument('--hide-outliers', action='store_true')
+    parser.add_argument('--outlier-method', default=DEFAULT_METHOD)
+    parser.add_argument('--full-resolution', action='store_true',
+                        help="Write every hourly point instead of downsampled traces")
+    parser.add_argument('--png', action='store_true', help="Also write PNG images")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    paths = export_charts(
+        args.sites, args.export, args.output, args.workers, compare=not args.no_compare,
+        show_outliers=not args.hide_outliers, outlier_method=args.outlier_method,
+        max_points=None if args.full_resolution else get_target_points(None), png=args.png
+    )
+    seconds = time.perf_counter() - started
+    print(f"Wrote {len(paths)} files to {args.output} in {seconds:.2f}s "
+          f"({len(paths) / seconds:.1f} files/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compact float32 representation of the prepared hourly frame.
+
+Exports are parsed straight to float32 and scattered into one preallocated
+(hours x columns) block on the hourly window, so a prepared upload takes half
+the memory of the float64 frame and no intermediate reindexed copy is made.
+The result is a regular DataFrame with a single float32 block; consumers that
+need float64 precision convert the columns they read.
+
+Compact mode is enabled by setting the DASHBOARD_COMPACT environment variable.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+from utils import get_time_range
+
+COMPACT_ENV = 'DASHBOARD_COMPACT'
+COMPACT_DTYPE = np.float32
+
+
+def compact_enabled():
+    """Check whether compact float32 storage is enabled."""
+    return os.environ.get(COMPACT_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+def prepare_compact(df, end_date_str, dtype=COMPACT_DTYPE):
+    """
+    Reindex a parsed export to its hourly window as one contiguous block.
+
+    Equivalent to prepare_dataframe followed by a cast to dtype.
+
+    Args:
+        df: Parsed dataframe with datetime index
+        end_date_str: End date string in format MMDDYYYY
+        dtype: Value dtype of the result
+
+    Returns:
+        Dataframe indexed by the full hourly range with a single dtype block
+    """
+    if not df.index.is_unique:
+        raise ValueError("cannot reindex on an axis with duplicate labels")
+    start_time_obj, end_time_obj = get_time_range(end_date_str)
+    full_range = pd.date_range(start=start_time_obj, end=end_time_obj, freq='h')
+
+    values = np.full((len(full_range), len(df.columns)), np.nan, dtype=dtype)
+    positions = full_range.get_indexer(df.index)
+    present = positions >= 0
+    if present.any():
+        values[positions[present]] = df.to_numpy(dtype=dtype)[present]
+    return pd.DataFrame(values, index=full_range, columns=df.columns, copy=False)
+
@@ -1,24 +1,36 @@
 """
 Main data processing logic for the dashboard.
 """
+import functools
 import streamlit as st
 import pandas as pd
-from utils import (
-    prepare_dataframe, filter_outliers, get_missing_data_timestamps,
-    check_solar_data_issues
+from utils import prepare_dataframe, get_missing_data_timestamps, get_missing_data_gaps
+from lazy_frame import LazyFrame
+from outliers import OutlierEngine, DEFAULT_METHOD
+from profiling import stage, profiled
+from aggregates import compute_daily_aggregates
+from solar_check import SolarHealthCheck
+from site_catalog import SiteCatalog
+from figure_cache import figure_key, memoized_figure
+from prewarm import prewarmer, prewarm_neighbours, neighbour_positions
+from overview import OVERVIEW_METRICS, load_site_overview
+from plotting import (
+    create_single_data_chart, create_multi_series_chart, create_overview_heatmap,
+    get_target_points
 )
-from plotting import create_single_data_chart, create_comparison_chart
 from ui_components import (
     create_header_section, create_date_selection_section, create_control_section,
-    create_data_selection_section,
-    display_solar_issues, display_missing_data
+    create_data_selection_section, create_overview_controls,
+    display_solar_issues, display_missing_data, display_noisy_meters, display_overview_summary
 )
 
 
 class DashboardProcessor:
     """Main processor class for the energy dashboard."""
     
-    def __init__(self, site_name, df, end_date_str, sites, streamlit_version):
+    def __init__(self, site_name, df, end_date_str, sites, streamlit_version, prepared=False,
+                 aggregates=None, solar_check=None, screen_width=None, gap_index=None,
+                 outliers=None, dataset_key=None):
         """
         Initialize the dashboard processor.
         
@@ -26,24 +38,201 @@ class DashboardProcessor:
             site_name: Name of the site
             df: Input dataframe
             end_date_str: End date string
-            sites: Sites configuration dictionary
+            sites: Sites configuration (SiteCatalog, dataframe or dictionary)
             streamlit_version: Streamlit version string
+            prepared: Whether df has already been through prepare_dataframe
+            aggregates: Optional precomputed DailyAggregates of the prepared frame
+            solar_check: Optional SolarHealthCheck resolved from sites
+            screen_width: Browser window width used to size chart traces
+            gap_index: Optional GapIndex of the prepared frame
+            outliers: Optional OutlierEngine of the prepared frame
+            dataset_key: Content key of the dataset; enables the chart cache
         """
         self.site_name = site_name
         self.df_original = df
         self.end_date_str = end_date_str
-        self.sites = sites
+        self.sites = sites if isinstance(sites, SiteCatalog) else SiteCatalog.from_sites(sites)
         self.streamlit_version = streamlit_version
+        self.prepared = prepared
+        self.aggregates = aggregates
+        self.solar_check = solar_check
+        self.screen_width = screen_width
+        self.gap_index = gap_index
+        self.outliers = outliers
+        self.dataset_key = dataset_key
         self.df_processed = None
         
         # Initialize session state
-        if "show_data_1" not in st.session_state:
-            st.session_state.show_data_1 = False
+        if "extra_points" not in st.session_state:
+            st.session_state.extra_points = 0
     
+    @profiled('prepare_data')
     def prepare_data(self):
         """Prepare the dataframe with proper time range."""
-        self.df_processed = prepare_dataframe(self.df_original, self.end_date_str)
+        if self.prepared:
+            self.df_processed = self.df_original
+        else:
+            self.df_processed = prepare_dataframe(self.df_original, self.end_date_str)
+        if self.outliers is None:
+            self.outliers = OutlierEngine(self.df_processed)
+    
+    def get_frame(self, columns):
+        """
+        Get a dataframe holding at least the given columns.
+        
+        For lazily loaded data only the requested columns are materialized.
+        
+        Args:
+            columns: Column names needed by the caller
+            
+        Returns:
+            Dataframe with the prepared time index
+        """
+        if isinstance(self.df_processed, LazyFrame):
+            return self.df_processed.select(columns)
+        return self.df_processed
     
+    def filter_outliers(self, df_view, data_point, show_outliers, method=DEFAULT_METHOD):
+        """
+        Filter outliers of one column with the dataset's outlier engine.
+        
+        Args:
+            df_view: Dataframe holding data_point
+            data_point: Column name to filter
+            show_outliers: Boolean to show/hide outliers
+            method: Outlier method name
+            
+        Returns:
+            Filtered dataframe holding data_point
+        """
+        if show_outliers:
+            return df_view
+        return self.outliers.filter(data_point, show_outliers, method)
+    
+    def single_chart_key(self, data_point, unit, show_outliers, method, start_dt, end_dt,
+                         max_points):
+        """
+        Get the figure cache key of a single data point chart.
+        
+        Returns:
+            Hashable key, or None when the dataset has no content key
+        """
+        # The method only matters when outliers are hidden
+        method = None if show_outliers else method
+        return figure_key(self.dataset_key, 'single', data_point, unit, show_outliers, method,
+                          start_dt, end_dt, max_points)
+    
+    def multi_chart_key(self, series, show_outliers, method, start_dt, end_dt, max_points):
+        """
+        Get the figure cache key of a comparison chart.
+        
+        Returns:
+            Hashable key, or None when the dataset has no content key
+        """
+        traces = tuple((data['data_point'], data['data_desc'], data['unit'], data.get('axis'))
+                       for data in series)
+        method = None if show_outliers else method
+        return figure_key(self.dataset_key, 'multi', traces, show_outliers, method, start_dt,
+                          end_dt, max_points)
+    
+    def build_single_chart(self, df_view, data_point, unit, show_outliers, method, start_dt,
+                           end_dt, aggregates, max_points):
+        """
+        Filter a data point and build its hourly, daily and EMA chart.
+        
+        Args:
+            df_view: Dataframe holding data_point
+            data_point: Column name to chart
+            unit: Unit string for labels
+            show_outliers: Boolean to show/hide outliers
+            method: Outlier method name
+            start_dt: Start datetime
+            end_dt: End datetime
+            aggregates: DailyAggregates holding data_point, or None
+            max_points: Downsample the hourly trace to about this many points
+            
+        Returns:
+            Plotly figure object
+        """
+        with stage('filter_outliers'):
+            df_plot = self.filter_outliers(df_view, data_point, show_outliers, method)
+        # Precomputed daily totals only hold for unfiltered data
+        daily = None
+        if show_outliers and aggregates is not None and data_point in aggregates:
+            daily = aggregates.daily(data_point)
+        with stage('build_chart'):
+            return create_single_data_chart(
+                df_plot, data_point, unit, start_dt, end_dt, daily, max_points
+            )
+    
+    def build_multi_chart(self, series, show_outliers, method, start_dt, end_dt, max_points):
+        """
+        Filter the selected data points and build their comparison chart.
+        
+        Args:
+            series: Primary and comparison data selections
+            show_outliers: Boolean to show/hide outliers
+            method: Outlier method name
+            start_dt: Start datetime
+            end_dt: End datetime
+            max_points: Downsample each trace to about this many points
+            
+        Returns:
+            Plotly figure object
+        """
+        # One aligned array of all selected columns
+        series_columns = list(dict.fromkeys(data['data_point'] for data in series))
+        with stage('filter_outliers'):
+            values = self.outliers.filter_values(series_columns, show_outliers, method)
+        positions = [series_columns.index(data['data_point']) for data in series]
+        with stage('build_chart'):
+            return create_multi_series_chart(
+                self.outliers.df.index, values[:, positions], series, start_dt, end_dt, max_points
+            )
+    
+    def prewarm_neighbours(self, primary_data, show_outliers, method, start_dt, end_dt,
+                           max_points):
+        """
+        Build the charts of the data points next to the primary one in the background.
+        
+        Prev/Next then find the figure in the chart cache instead of building it.
+        
+        Args:
+            primary_data: Primary data selection
+            show_outliers: Boolean to show/hide outliers
+            method: Outlier method name
+            start_dt: Start datetime
+            end_dt: End datetime
+            max_points: Downsample the hourly trace to about this many points
+        """
+        depth = prewarm_neighbours()
+        if depth <= 0 or self.dataset_key is None:
+            return
+        site, data_type = primary_data['site'], primary_data['data_type']
+        columns = self.sites.data_columns(site, data_type)
+        position = self.sites.position(site, data_type, primary_data['data_desc'])
+        for neighbour in neighbour_positions(position, len(columns), depth):
+            data_point = columns[neighbour]
+            key = self.single_chart_key(data_point, self.sites.unit(data_point), show_outliers,
+                                        method, start_dt, end_dt, max_points)
+            prewarmer.schedule(key, functools.partial(
+                self._build_neighbour, data_point, show_outliers, method, start_dt, end_dt,
+                max_points
+            ))
+    
+    def _build_neighbour(self, data_point, show_outliers, method, start_dt, end_dt, max_points):
+        # Aggregate the same way process_and_display does, so cached and
+        # foreground figures are identical
+        df_view = self.get_frame([data_point])
+        aggregates = self.aggregates
+        if aggregates is None:
+            aggregates = compute_daily_aggregates(df_view[[data_point]])
+        return self.build_single_chart(
+            df_view, data_point, self.sites.unit(data_point), show_outliers, method, start_dt,
+            end_dt, aggregates, max_points
+        )
+    
+    @profiled('create_ui_components')
     def create_ui_components(self):
         """Create all UI components and get user inputs."""
         # Header section
@@ -53,41 +242,51 @@ class DashboardProcessor:
         start_date, end_date = create_date_selection_section(self.site_name, self.df_processed)
         
         # Control section
-        show_outliers = create_control_section()
+        show_outliers, outlier_method, full_resolution, rank_outliers = create_control_section()
         
         # Primary data selection
         site, data_type, data_desc, data_point, unit, same_y_axis = create_data_selection_section(self.sites)
         
-        # Secondary data selection (if enabled)
-        secondary_data = None
-        # same_y_axis = False
-        
-        if st.session_state.show_data_1:
-            site_1, data_type_1, data_desc_1, data_point_1, unit_1, same_y_axis = create_data_selection_section(
-                self.sites, "1", True, unit
-            )
+        # Additional data selections for comparison
+        compare_data = []
+        for i in range(1, st.session_state.extra_points + 1):
+            site_i, data_type_i, data_desc_i, data_point_i, unit_i, same_y_axis_i = \
+                create_data_selection_section(self.sites, str(i), True, unit)
             
-            secondary_data = {
-                'site': site_1,
-                'data_type': data_type_1,
-                'data_desc': data_desc_1,
-                'data_point': data_point_1,
-                'unit': unit_1
-            }
+            # Series sharing the primary axis, or with a unit of their own, are
+            # grouped; a series with the primary's unit gets a separate axis
+            # unless "Use same y-axis" is checked
+            if same_y_axis_i:
+                axis = 'primary'
+            elif unit_i == unit:
+                axis = f'series{i}'
+            else:
+                axis = unit_i
+            compare_data.append({
+                'site': site_i,
+                'data_type': data_type_i,
+                'data_desc': data_desc_i,
+                'data_point': data_point_i,
+                'unit': unit_i,
+                'axis': axis
+            })
         
         return {
             'start_date': start_date,
             'end_date': end_date,
             'show_outliers': show_outliers,
+            'outlier_method': outlier_method,
+            'full_resolution': full_resolution,
+            'rank_outliers': rank_outliers,
             'primary_data': {
                 'site': site,
                 'data_type': data_type,
                 'data_desc': data_desc,
                 'data_point': data_point,
-                'unit': unit
+                'unit': unit,
+                'axis': 'primary'
             },
-            'secondary_data': secondary_data,
-            'same_y_axis': same_y_axis
+            'compare_data': compare_data
         }
     
     def process_and_display(self, config):
@@ -101,42 +300,74 @@ class DashboardProcessor:
         start_date = config['start_date']
         end_date = config['end_date']
         show_outliers = config['show_outliers']
+        outlier_method = config.get('outlier_method', DEFAULT_METHOD)
         primary_data = config['primary_data']
-        secondary_data = config['secondary_data']
-        same_y_axis = config['same_y_axis']
+        compare_data = config.get('compare_data', [])
+        max_points = None if config['full_resolution'] else get_target_points(self.screen_width)
+        
+        # Convert dates to datetime; the first rerun gets the index timestamps
+        # themselves, so truncate to days to keep chart keys stable
+        start_dt = pd.to_datetime(start_date).normalize()
+        end_dt = pd.to_datetime(end_date).normalize() + pd.Timedelta(days=1) - pd.Timedelta(hours=1)
         
-        # Convert dates to datetime
-        start_dt = pd.to_datetime(start_date)
-        end_dt = pd.to_datetime(end_date) + pd.Timedelta(days=1) - pd.Timedelta(hours=1)
+        if self.solar_check is None:
+            self.solar_check = SolarHealthCheck.from_catalog(self.sites)
         
-        # Filter primary data
-        df_plot = filter_outliers(self.df_processed, primary_data['data_point'], show_outliers)
+        # Materialize only the columns this render needs
+        series = [primary_data] + list(compare_data)
+        series_columns = list(dict.fromkeys(data['data_point'] for data in series))
+        columns = series_columns + list(self.solar_check.columns)
+        with stage('materialize'):
+            df_view = self.get_frame(columns)
+            aggregates = self.aggregates
+            if aggregates is None:
+                present = [col for col in dict.fromkeys(columns) if col in df_view.columns]
+                aggregates = compute_daily_aggregates(df_view[present])
         
-        # Create chart based on whether we have secondary data
-        if secondary_data is None:
-            # Single data point chart
-            fig = create_single_data_chart(
-                df_plot, primary_data['data_point'], primary_data['unit'], start_dt, end_dt
+        # Create chart based on whether we compare several data points
+        if not compare_data:
+            # Single data point chart, possibly prebuilt by a Prev/Next prewarm
+            key = self.single_chart_key(
+                primary_data['data_point'], primary_data['unit'], show_outliers, outlier_method,
+                start_dt, end_dt, max_points
             )
+            fig = memoized_figure(key, lambda: self.build_single_chart(
+                df_view, primary_data['data_point'], primary_data['unit'], show_outliers,
+                outlier_method, start_dt, end_dt, aggregates, max_points
+            ))
         else:
-            # Comparison chart
-            df_plot_1 = filter_outliers(self.df_processed, secondary_data['data_point'], show_outliers)
-            fig = create_comparison_chart(
-                df_plot, primary_data['data_point'], primary_data['unit'], primary_data['data_desc'],
-                df_plot_1, secondary_data['data_point'], secondary_data['unit'], secondary_data['data_desc'],
-                start_dt, end_dt, same_y_axis
-            )
+            key = self.multi_chart_key(series, show_outliers, outlier_method, start_dt, end_dt,
+                                       max_points)
+            fig = memoized_figure(key, lambda: self.build_multi_chart(
+                series, show_outliers, outlier_method, start_dt, end_dt, max_points
+            ))
         
         # Display the chart
-        st.plotly_chart(fig, use_container_width=True)
+        with stage('plotly_chart'):
+            st.plotly_chart(fig, use_container_width=True)
+        if not compare_data:
+            self.prewarm_neighbours(primary_data, show_outliers, outlier_method, start_dt, end_dt,
+                                    max_points)
         
         # Check for solar data issues
-        problematic_points = check_solar_data_issues(self.sites.to_dict(), self.df_processed)
-        display_solar_issues(problematic_points)
+        with stage('solar_check'):
+            problematic_points = self.solar_check.run(df_view, aggregates)
+            display_solar_issues(problematic_points)
         
         # Display missing data information
-        missing_data = get_missing_data_timestamps(self.df_processed, primary_data['data_point'])
-        display_missing_data(missing_data)
+        with stage('missing_data'):
+            if self.gap_index is not None and primary_data['data_point'] in self.gap_index:
+                gaps = self.gap_index.gaps(primary_data['data_point'])
+            else:
+                gaps = get_missing_data_gaps(
+                    get_missing_data_timestamps(df_view, primary_data['data_point'])
+                )
+            display_missing_data(gaps)
+        
+        # Rank data points by their number of outliers
+        if config.get('rank_outliers'):
+            with stage('noisy_meters'):
+                display_noisy_meters(self.outliers.flagged_counts(outlier_method), self.sites)
     
     def run(self):
         """Main execution method."""
@@ -145,7 +376,9 @@ class DashboardProcessor:
         self.process_and_display(config)
 
 
-def process_df(site_name, df, end_date_str, sites, streamlit_version):
+def process_df(site_name, df, end_date_str, sites, streamlit_version, prepared=False,
+               aggregates=None, solar_check=None, screen_width=None, gap_index=None,
+               outliers=None, dataset_key=None):
     """
     Main processing function - refactored for better organization.
     
@@ -153,8 +386,57 @@ def process_df(site_name, df, end_date_str, sites, streamlit_version):
         site_name: Name of the site
         df: Input dataframe
         end_date_str: End date string
-        sites: Sites configuration
+        sites: Sites configuration (SiteCatalog, dataframe or dictionary)
         streamlit_version: Streamlit version string
+        prepared: Whether df has already been through prepare_dataframe
+        aggregates: Optional precomputed DailyAggregates of the prepared frame
+        solar_check: Optional SolarHealthCheck resolved from sites
+        screen_width: Browser window width used to size chart traces
+        gap_index: Optional GapIndex of the prepared frame
+        outliers: Optional OutlierEngine of the prepared frame
+        dataset_key: Content key of the dataset; enables the chart cache
+    """
+    processor = DashboardProcessor(
+        site_name, df, end_date_str, sites, streamlit_version, prepared, aggregates, solar_check,
+        screen_width, gap_index, outliers, dataset_key
+    )
+    processor.run()
+
+
+def process_overview(site_name, dataset, sites, streamlit_version):
     """
-    processor = DashboardProcessor(site_name, df, end_date_str, sites, streamlit_version)
-    processor.run()
\ No newline at end of file
+    Display the heatmap of every data point of the loaded site, day by day.
+    
+    Args:
+        site_name: Name of the site
+        dataset: Dataset from cache.load_dataset
+        sites: Sites configuration (SiteCatalog, dataframe or dictionary)
+        streamlit_version: Streamlit version string
+    """
+    sites = sites if isinstance(sites, SiteCatalog) else SiteCatalog.from_sites(sites)
+    create_header_section(site_name, dataset.df, streamlit_version)
+    start_date, end_date = create_date_selection_section(site_name, dataset.df)
+    metric, outlier_method = create_overview_controls()
+    start_dt = pd.to_datetime(start_date).normalize()
+    end_dt = pd.to_datetime(end_date).normalize()
+    
+    # Rank, draw and summarize the selected days only
+    with stage('site_overview'):
+        overview = load_site_overview(dataset, outlier_method).between(start_dt, end_dt)
+    
+    # Most suspect meters on top
+    order = overview.worst_first(metric)
+    labels = []
+    for column in overview.columns[order]:
+        location = sites.locate(column)
+        labels.append(' / '.join(location) if location else column)
+    key = figure_key(dataset.key, 'overview', metric, outlier_method, start_dt, end_dt,
+                     tuple(labels))
+    with stage('build_chart'):
+        fig = memoized_figure(key, lambda: create_overview_heatmap(
+            overview.index, labels, overview.table(metric)[order], OVERVIEW_METRICS[metric]
+        ))
+    with stage('plotly_chart'):
+        st.plotly_chart(fig, use_container_width=True)
+    
+    display_overview_summary(overview.summary(), sites)
@@ -0,0 +1,64 @@
+"""
+Memoized Plotly figures keyed by dataset and rendering inputs.
+
+Reruns triggered by widgets that do not affect the chart reuse the figure
+built for the same inputs, and charts prewarmed in the background land in the
+same cache. Figures are never mutated after they are built, so one figure is
+shared by all sessions viewing the same export.
+"""
+import numpy as np
+
+from cache import LRUCache
+
+
+class CachedFigure:
+    """A built figure with its approximate memory footprint."""
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.nbytes = sum(
+            np.asarray(trace[axis]).nbytes
+            for trace in fig.data for axis in ('x', 'y', 'z')
+            if axis in trace and trace[axis] is not None
+        )
+
+
+def figure_key(dataset_key, kind, *inputs):
+    """
+    Build the cache key of a figure.
+
+    Args:
+        dataset_key: Content key of the dataset, or None
+        kind: Chart builder name
+        *inputs: Hashable rendering inputs of the chart
+
+    Returns:
+        Hashable key, or None when the dataset has no content key
+    """
+    if dataset_key is None:
+        return None
+    return (dataset_key, kind) + inputs
+
+
+def memoized_figure(key, build):
+    """
+    Return the cached figure of a key, building and caching it on a miss.
+
+    Args:
+        key: Figure key, or None to always build
+        build: Function returning the figure
+
+    Returns:
+        Plotly figure object
+    """
+    if key is None:
+        return build()
+    cached = figure_cache.get(key)
+    if cached is not None:
+        return cached.fig
+    fig = build()
+    figure_cache.put(key, CachedFigure(fig))
+    return fig
+
+
+figure_cache = LRUCache(max_entries=128, max_bytes=256 * 1024 ** 2)
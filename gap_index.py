@@ -0,0 +1,144 @@
+"""
+Run-length encoded index of missing data for every column.
+
+Built once per upload from the NaN mask of the 2-D value array, the index
+stores each gap as a (column, start row, stop row) triple plus per-day missing
+counts, so missing-data lookups cost O(gaps) instead of a scan of the frame.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMN_BLOCK = 512
+
+
+class GapIndex:
+    """Missing-data spans and completeness of all columns of a frame."""
+
+    def __init__(self, index, columns, gap_columns, gap_starts, gap_stops, day_index,
+                 daily_missing, hours_per_day):
+        """
+        Initialize the index.
+
+        Args:
+            index: Hourly DatetimeIndex of the frame
+            columns: Column names
+            gap_columns: Column position of each gap, sorted
+            gap_starts: First missing row of each gap
+            gap_stops: Row after the last missing row of each gap
+            day_index: Daily DatetimeIndex
+            daily_missing: Missing hours per day, shape (days, columns)
+            hours_per_day: Rows per day, shape (days,)
+        """
+        self.index = index
+        self.columns = pd.Index(columns)
+        self.gap_columns = gap_columns
+        self.gap_starts = gap_starts
+        self.gap_stops = gap_stops
+        self.day_index = day_index
+        self.daily_missing = daily_missing
+        self.hours_per_day = hours_per_day
+        self._offsets = np.searchsorted(gap_columns, np.arange(len(self.columns) + 1))
+        self.missing_counts = pd.Series(
+            np.bincount(gap_columns, weights=gap_stops - gap_starts,
+                        minlength=len(self.columns)).astype(np.int64),
+            index=self.columns
+        )
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    @property
+    def nbytes(self):
+        return (self.gap_columns.nbytes + self.gap_starts.nbytes + self.gap_stops.nbytes
+                + self.daily_missing.nbytes + self.index.nbytes)
+
+    def _span(self, column):
+        loc = self.columns.get_loc(column)
+        return slice(self._offsets[loc], self._offsets[loc + 1])
+
+    def missing_count(self, column):
+        """Return the number of missing hours of a column."""
+        return int(self.missing_counts[column])
+
+    def gaps(self, column):
+        """
+        Return the gap ranges of a column.
+
+        Args:
+            column: Column name
+
+        Returns:
+            Dataframe with start, end and hours columns, one row per gap
+        """
+        span = self._span(column)
+        starts = self.gap_starts[span]
+        stops = self.gap_stops[span]
+        return pd.DataFrame({
+            'start': self.index[starts],
+            'end': self.index[stops - 1],
+            'hours': stops - starts
+        })
+
+    def missing_timestamps(self, column):
+        """Return the timestamps where a column is missing."""
+        span = self._span(column)
+        positions = [np.arange(start, stop)
+                     for start, stop in zip(self.gap_starts[span], self.gap_stops[span])]
+        if not positions:
+            return self.index[:0]
+        return self.index[np.concatenate(positions)]
+
+    def completeness(self):
+        """
+        Return the fraction of non-missing hours per day and column.
+
+        Returns:
+            Dataframe indexed by day with one column per data column
+        """
+        hours = self.hours_per_day[:, None].astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = 1.0 - self.daily_missing / hours
+        return pd.DataFrame(values, index=self.day_index, columns=self.columns)
+
+
+def build_gap_index(df):
+    """
+    Build the gap index of all columns of a frame.
+
+    Args:
+        df: Hourly dataframe with datetime index, sorted by time
+
+    Returns:
+        GapIndex instance
+    """
+    n_rows, n_columns = df.shape
+    days = df.index.normalize()
+    if n_rows:
+        day_index = pd.DatetimeIndex(days.unique())
+        day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        hours_per_day = np.diff(np.r_[day_starts, n_rows])
+    else:
+        day_index = pd.DatetimeIndex([])
+        day_starts = np.array([], dtype=np.int64)
+        hours_per_day = np.array([], dtype=np.int64)
+    daily_missing = np.zeros((len(day_index), n_columns), dtype=np.int32)
+
+    gap_columns, gap_starts, gap_stops = [], [], []
+    for block in range(0, n_columns, COLUMN_BLOCK):
+        missing = df.iloc[:, block:block + COLUMN_BLOCK].isna().to_numpy()
+        if n_rows:
+            daily_missing[:, block:block + missing.shape[1]] = np.add.reduceat(
+                missing, day_starts, axis=0, dtype=np.int32
+            )
+        edges = np.diff(missing.T.astype(np.int8), axis=1, prepend=0, append=0)
+        start_cols, starts = np.nonzero(edges == 1)
+        _, stops = np.nonzero(edges == -1)
+        gap_columns.append(start_cols + block)
+        gap_starts.append(starts)
+        gap_stops.append(stops)
+
+    def _join(parts):
+        return np.concatenate(parts).astype(np.int64) if parts else np.array([], dtype=np.int64)
+
+    return GapIndex(df.index, df.columns, _join(gap_columns), _join(gap_starts),
+                    _join(gap_stops), day_index, daily_missing, hours_per_day)
@@ -0,0 +1,165 @@
+"""
+Fast CSV ingest for uploaded data exports.
+
+The exports have a header row, a units row directly below it and a one-line
+footer. The original reader dropped those with ``skiprows=[1]`` and
+``skipfooter=1``, which forces pandas onto the pure-Python tokenizer. Here the
+units row and footer are removed at the byte level so the C or pyarrow engine
+can parse the remaining body.
+"""
+import csv
+import io
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    DEFAULT_ENGINE = 'pyarrow'
+except ImportError:
+    pa = None
+    DEFAULT_ENGINE = 'c'
+
+TIME_COLUMN = 'time'
+
+
+def read_upload_bytes(data_file):
+    """
+    Return the raw bytes of an uploaded file.
+
+    Args:
+        data_file: Streamlit UploadedFile, file-like object or bytes
+
+    Returns:
+        File content as bytes
+    """
+    if isinstance(data_file, (bytes, bytearray, memoryview)):
+        return bytes(data_file)
+    if hasattr(data_file, 'getvalue'):
+        return data_file.getvalue()
+    data_file.seek(0)
+    return data_file.read()
+
+
+def strip_units_and_footer(raw):
+    """
+    Remove the units row (second line) and the footer (last line) from a CSV export.
+
+    Args:
+        raw: CSV content as bytes
+
+    Returns:
+        CSV content as bytes with only the header and data rows
+    """
+    body = raw.rstrip(b'\r\n')
+    header_end = body.find(b'\n')
+    if header_end < 0:
+        return body + b'\n'
+    units_end = body.find(b'\n', header_end + 1)
+    footer_start = body.rfind(b'\n')
+    if units_end < 0 or footer_start <= units_end:
+        return body[:header_end + 1]
+    return body[:header_end + 1] + body[units_end + 1:footer_start + 1]
+
+
+def read_header(body):
+    """
+    Parse the column names from the first line of a CSV body.
+
+    Args:
+        body: CSV content as bytes
+
+    Returns:
+        List of column names
+    """
+    line_end = body.find(b'\n')
+    first_line = body if line_end < 0 else body[:line_end]
+    return next(csv.reader([first_line.decode().rstrip('\r')]))
+
+
+def read_data_file_legacy(data_file):
+    """
+    Read a CSV export with the pure-Python parser.
+
+    Args:
+        data_file: Uploaded CSV file or bytes
+
+    Returns:
+        Dataframe indexed by time
+    """
+    if isinstance(data_file, (bytes, bytearray, memoryview)):
+        data_file = io.BytesIO(bytes(data_file))
+    else:
+        data_file.seek(0)
+    return pd.read_csv(
+        data_file,
+        skiprows=[1],
+        header=0,
+        skipfooter=1,
+        index_col=TIME_COLUMN,
+        parse_dates=[TIME_COLUMN],
+        engine='python'
+    )
+
+
+def parse_body(body, dtype=np.float64, engine=DEFAULT_ENGINE, date_format=None):
+    """
+    Parse a CSV body that only contains the header and data rows.
+
+    Args:
+        body: CSV content as bytes
+        dtype: Numeric dtype for all data columns
+        engine: Pandas parser engine ('pyarrow' or 'c')
+        date_format: Optional strftime format of the time column
+
+    Returns:
+        Dataframe indexed by time
+    """
+    header = read_header(body)
+
+    if engine == 'pyarrow' and pa is not None:
+        # pyarrow.csv directly: pandas' pyarrow engine casts column by column
+        arrow_type = pa.from_numpy_dtype(np.dtype(dtype))
+        column_types = {col: arrow_type for col in header if col != TIME_COLUMN}
+        column_types[TIME_COLUMN] = pa.string()
+        table = pa_csv.read_csv(
+            io.BytesIO(body),
+            convert_options=pa_csv.ConvertOptions(column_types=column_types)
+        )
+        df = table.to_pandas()
+    else:
+        dtypes = {col: dtype for col in header if col != TIME_COLUMN}
+        dtypes[TIME_COLUMN] = str
+        df = pd.read_csv(io.BytesIO(body), header=0, dtype=dtypes, engine='c')
+
+    time_values = df.pop(TIME_COLUMN)
+    if date_format is None:
+        index = pd.to_datetime(time_values)
+    else:
+        index = pd.to_datetime(time_values, format=date_format)
+    df.index = pd.DatetimeIndex(index, name=TIME_COLUMN)
+    return df
+
+
+def read_data_file(data_file, dtype=np.float64, engine=DEFAULT_ENGINE, date_format=None):
+    """
+    Read a CSV export using the fast parser, falling back to the Python parser.
+
+    The result matches the frame produced by the original
+    ``pd.read_csv(..., skipfooter=1, engine='python')`` call. If the body
+    contains non-numeric data columns the legacy reader is used instead.
+
+    Args:
+        data_file: Uploaded CSV file or bytes
+        dtype: Numeric dtype for all data columns
+        engine: Pandas parser engine ('pyarrow' or 'c')
+        date_format: Optional strftime format of the time column
+
+    Returns:
+        Dataframe indexed by time
+    """
+    raw = read_upload_bytes(data_file)
+    try:
+        return parse_body(strip_units_and_footer(raw), dtype, engine, date_format)
+    except (ValueError, TypeError):
+        return read_data_file_legacy(raw)
@@ -0,0 +1,193 @@
+"""
+Column-projected lazy access to prepared data.
+
+A LazyFrame exposes the prepared time index and column names of an export but
+only materializes the columns that are actually requested, keeping a small
+cache of recently used columns. Memory therefore scales with the number of
+viewed data points instead of the number of columns in the export.
+
+Lazy loading is enabled by setting the DASHBOARD_LAZY_COLUMNS environment
+variable.
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+from ingest import (
+    TIME_COLUMN, DEFAULT_ENGINE, strip_units_and_footer, read_header, pa, pa_csv
+)
+from utils import get_time_range
+
+LAZY_ENV = 'DASHBOARD_LAZY_COLUMNS'
+
+
+def lazy_enabled():
+    """Check whether lazy column loading is enabled."""
+    return os.environ.get(LAZY_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+class CsvColumnSource:
+    """Read individual columns from a CSV export held in memory."""
+
+    def __init__(self, raw, dtype=np.float64):
+        """
+        Index the CSV header and time column.
+
+        Args:
+            raw: CSV content as bytes
+            dtype: Numeric dtype for data columns
+        """
+        self.body = strip_units_and_footer(raw)
+        self.dtype = np.dtype(dtype)
+        self.columns = [col for col in read_header(self.body) if col != TIME_COLUMN]
+        times = self._read([TIME_COLUMN], str)[TIME_COLUMN]
+        self.index = pd.DatetimeIndex(pd.to_datetime(times), name=TIME_COLUMN)
+
+    @property
+    def nbytes(self):
+        return len(self.body) + self.index.nbytes
+
+    def _read(self, columns, dtype):
+        if DEFAULT_ENGINE == 'pyarrow':
+            arrow_type = pa.string() if dtype is str else pa.from_numpy_dtype(dtype)
+            table = pa_csv.read_csv(
+                io.BytesIO(self.body),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=columns,
+                    column_types={col: arrow_type for col in columns}
+                )
+            )
+            return {col: table.column(col).to_numpy() for col in columns}
+        df = pd.read_csv(io.BytesIO(self.body), usecols=columns,
+                         dtype={col: dtype for col in columns}, engine='c')
+        return {col: df[col].to_numpy() for col in columns}
+
+    def read_columns(self, columns):
+        """
+        Read data columns in file row order.
+
+        Args:
+            columns: List of column names
+
+        Returns:
+            Dictionary of column name to NumPy array
+        """
+        return self._read(list(columns), self.dtype)
+
+
+class StoreColumnSource:
+    """Read individual columns from a prepared frame in the on-disk store."""
+
+    def __init__(self, store, site_name, end_date_str):
+        """
+        Index the stored columns and time index.
+
+        Args:
+            store: ColumnStore instance
+            site_name: Name of the site
+            end_date_str: End date string in format MMDDYYYY
+        """
+        self.store = store
+        self.site_name = site_name
+        self.end_date_str = end_date_str
+        self.columns = store.columns(site_name, end_date_str)
+        self.index = store.load(site_name, end_date_str, columns=[]).index
+
+    @property
+    def nbytes(self):
+        return self.index.nbytes
+
+    def read_columns(self, columns):
+        """
+        Read data columns in stored row order.
+
+        Args:
+            columns: List of column names
+
+        Returns:
+            Dictionary of column name to NumPy array
+        """
+        df = self.store.load(self.site_name, self.end_date_str, columns=list(columns))
+        return {col: df[col].to_numpy() for col in columns}
+
+
+class LazyFrame:
+    """Read-only, column-on-demand view of a prepared dataframe."""
+
+    def __init__(self, source, end_date_str=None, max_cached_columns=32):
+        """
+        Initialize the lazy frame.
+
+        Args:
+            source: Column source (CsvColumnSource or StoreColumnSource)
+            end_date_str: End date string in format MMDDYYYY; if given, the
+                source rows are reindexed like prepare_dataframe does
+            max_cached_columns: Number of materialized columns to keep
+        """
+        self.source = source
+        self.columns = pd.Index(source.columns)
+        self.max_cached_columns = max_cached_columns
+        self._column_cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        if end_date_str is None:
+            self.index = source.index
+            self._positions = None
+        else:
+            start_time_obj, end_time_obj = get_time_range(end_date_str)
+            self.index = pd.date_range(start=start_time_obj, end=end_time_obj, freq='h')
+            self._positions = source.index.get_indexer(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def __getitem__(self, column):
+        return self.select([column])[column]
+
+    @property
+    def shape(self):
+        return len(self.index), len(self.columns)
+
+    @property
+    def nbytes(self):
+        cached = sum(values.nbytes for values in self._column_cache.values())
+        return self.source.nbytes + self.index.nbytes + cached
+
+    def _align(self, values):
+        if self._positions is None:
+            return values
+        aligned = values[self._positions].astype(np.result_type(values.dtype, np.float32), copy=False)
+        aligned[self._positions < 0] = np.nan
+        return aligned
+
+    def select(self, columns):
+        """
+        Materialize a set of columns as a regular dataframe.
+
+        Args:
+            columns: Iterable of column names
+
+        Returns:
+            Dataframe with the prepared time index and the requested columns
+        """
+        columns = list(dict.fromkeys(col for col in columns if col in self.columns))
+        with self._lock:
+            missing = [col for col in columns if col not in self._column_cache]
+            if missing:
+                for col, values in self.source.read_columns(missing).items():
+                    self._column_cache[col] = self._align(values)
+
+            data = {}
+            for col in columns:
+                self._column_cache.move_to_end(col)
+                data[col] = self._column_cache[col]
+            while len(self._column_cache) > max(self.max_cached_columns, len(columns)):
+                self._column_cache.popitem(last=False)
+
+        return pd.DataFrame(data, index=self.index, columns=pd.Index(columns, dtype=object))
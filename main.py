@@ -2,12 +2,17 @@
 Main Streamlit application entry point.
 """
 import streamlit as st
-import pandas as pd
 import re
 from streamlit_js_eval import streamlit_js_eval
 
-from ui_components import setup_page_config, create_file_upload_section
-from data_processor import process_df
+from ui_components import (
+    setup_page_config, create_file_upload_section, create_view_selection, display_profile
+)
+from data_processor import process_df, process_overview
+from cache import load_site_catalog, load_solar_check, load_dataset
+from registry import dataset_registry
+from figure_cache import figure_cache
+from profiling import start_rerun, finish_rerun, set_rerun_label, stage
 
 
 def main():
@@ -15,6 +20,40 @@ def main():
     # Set up page configuration
     setup_page_config()
     
+    # Time the stages of this rerun when DASHBOARD_PROFILE is set
+    start_rerun()
+    try:
+        run_dashboard()
+    finally:
+        profile = finish_rerun()
+        if profile is not None:
+            display_profile(profile, {'Figures': figure_cache}, dataset_registry)
+
+
+def hold_dataset(dataset):
+    """
+    Lease the shared copy of a dataset for this session.
+    
+    The lease of the export viewed before is released, so a dataset stays
+    registered only while some session views it.
+    
+    Args:
+        dataset: Dataset returned by load_dataset
+        
+    Returns:
+        The shared Dataset instance
+    """
+    lease = st.session_state.get('dataset_lease')
+    if lease is None or lease.released or lease.key != dataset.key:
+        if lease is not None:
+            lease.release()
+        lease = dataset_registry.acquire(dataset)
+        st.session_state.dataset_lease = lease
+    return lease.dataset
+
+
+def run_dashboard():
+    """Upload files and render the dashboard."""
     # Get screen width for responsive layout
     screen_width = streamlit_js_eval(js_expressions='window.innerWidth', key='WIN_WIDTH')
     
@@ -22,31 +61,32 @@ def main():
     site_info, data_file = create_file_upload_section(screen_width)
     
     # Process uploaded files
-    if site_info is not None:
-        site_name = site_info.name.split('.')[0].capitalize()
-        sites = pd.read_json(site_info)
-    
     if site_info is not None and data_file is not None:
         try:
+            site_name = site_info.name.split('.')[0].capitalize()
+            set_rerun_label(site_name)
+            with stage('load_sites'):
+                sites = load_site_catalog(site_info)
+                solar_check = load_solar_check(site_info, sites)
+            
             # Extract date from filename
             match = re.search(r'_(\d{8})(?:_[^_]*)?\.csv', data_file.name)
             if not match:
                 st.error("Could not extract date from filename. Expected format: *_MMDDYYYY.csv")
                 return
             
-            # Read CSV file
-            df = pd.read_csv(
-                data_file,
-                skiprows=[1],
-                header=0,
-                skipfooter=1,
-                index_col='time',
-                parse_dates=['time'],
-                engine='python'
-            )
+            # Read CSV file (cached by content across reruns and on disk)
+            with stage('load_dataset'):
+                dataset = hold_dataset(load_dataset(data_file, match.group(1), site_name))
             
             # Process and display dashboard
-            process_df(site_name, df, match.group(1), sites, st.__version__)
+            if create_view_selection() == "Site overview":
+                process_overview(site_name, dataset, sites, st.__version__)
+            else:
+                process_df(site_name, dataset.df, match.group(1), sites, st.__version__,
+                           prepared=True, aggregates=dataset.aggregates, solar_check=solar_check,
+                           screen_width=screen_width, gap_index=dataset.gap_index,
+                           outliers=dataset.outliers, dataset_key=dataset.key)
             
         except Exception as e:
             st.error(f"Error processing files: {str(e)}")
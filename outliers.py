@@ -0,0 +1,318 @@
+"""
+Pluggable outlier detection with cached bounds.
+
+Each method turns a 2-D value array (hours x columns) into lower and upper
+bounds that broadcast against it, so the bounds of every column are computed
+in one vectorized pass. Bounds are cached per upload and method in their
+compact form (one fence per column, or an hour-of-day table); bounds with one
+value per hour are recomputed instead of kept. Filtering a single column
+works on that column's array and never copies the rest of the frame.
+
+Methods:
+    percentile: 10th/90th percentile fence widened by 1.5 x their spread
+    iqr: classic 25th/75th percentile Tukey fence
+    rolling_mad: centered one-week rolling median +/- 3 scaled MADs
+    seasonal_zscore: hour-of-day mean +/- 3 standard deviations
+"""
+import threading
+import warnings
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+ROLLING_WINDOW = 24 * 7
+MAD_SCALE = 1.4826
+Z_THRESHOLD = 3.0
+COLUMN_BLOCK = 512
+
+
+def nan_quantiles(values, quantiles):
+    """
+    Linear quantiles of each column of a 2-D array, ignoring NaN.
+
+    Gives the same results as ``np.nanquantile(values, quantiles, axis=0,
+    keepdims=True)`` from one sort of the array instead of a pass per column.
+
+    Args:
+        values: Array of shape (rows, columns)
+        quantiles: Quantiles in [0, 1]
+
+    Returns:
+        List with one array of shape (1, columns) per quantile
+    """
+    ordered = np.sort(values, axis=0)  # NaN sorts last
+    valid = np.count_nonzero(~np.isnan(values), axis=0)
+    last = np.maximum(valid - 1, 0)
+    result = []
+    for q in quantiles:
+        # Virtual index and interpolation as computed by NumPy's 'linear' method
+        virtual = (valid - 1) * q
+        floor = np.floor(virtual)
+        gamma = virtual - floor
+        below = np.clip(floor, 0, last).astype(np.intp)
+        above = np.where(virtual >= last, last, np.minimum(below + 1, last))
+        a = np.take_along_axis(ordered, below[None], axis=0)
+        b = np.take_along_axis(ordered, above[None], axis=0)
+        with np.errstate(invalid='ignore'):
+            diff = b - a
+            value = np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
+        value[:, valid == 0] = np.nan
+        result.append(value)
+    return result
+
+
+def _quantile_fence(values, low, high):
+    """Bounds from a quantile fence widened by 1.5 times its spread."""
+    q_low, q_high = nan_quantiles(values, [low, high])
+    spread = q_high - q_low
+    return q_low - 1.5 * spread, q_high + 1.5 * spread
+
+
+def percentile_bounds(values, index):
+    """Fence from the 10th and 90th percentiles (the dashboard default)."""
+    return _quantile_fence(values, 0.10, 0.90)
+
+
+def iqr_bounds(values, index):
+    """Tukey fence from the 25th and 75th percentiles."""
+    return _quantile_fence(values, 0.25, 0.75)
+
+
+def rolling_mad_bounds(values, index):
+    """Centered rolling median +/- Z_THRESHOLD scaled median absolute deviations."""
+    frame = pd.DataFrame(values)
+    rolling = dict(window=ROLLING_WINDOW, center=True, min_periods=ROLLING_WINDOW // 4)
+    median = frame.rolling(**rolling).median()
+    mad = (frame - median).abs().rolling(**rolling).median() * MAD_SCALE
+    median = median.to_numpy()
+    mad = mad.to_numpy()
+    return median - Z_THRESHOLD * mad, median + Z_THRESHOLD * mad
+
+
+def seasonal_zscore_table(values, index):
+    """
+    Hour-of-day mean +/- Z_THRESHOLD standard deviations of each column.
+
+    Args:
+        values: Array of shape (rows, columns)
+        index: DatetimeIndex of the rows
+
+    Returns:
+        Tuple of (lower, upper) arrays of shape (24, columns)
+    """
+    hours = np.asarray(index.hour)
+    mean = np.full((24, values.shape[1]), np.nan)
+    std = np.full((24, values.shape[1]), np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for hour in np.unique(hours):
+            rows = values[hours == hour]
+            mean[hour] = np.nanmean(rows, axis=0)
+            std[hour] = np.nanstd(rows, axis=0)
+    return mean - Z_THRESHOLD * std, mean + Z_THRESHOLD * std
+
+
+def seasonal_zscore_bounds(values, index):
+    """Per hour-of-day mean +/- Z_THRESHOLD standard deviations."""
+    hours = np.asarray(index.hour)
+    lower, upper = seasonal_zscore_table(values, index)
+    return lower[hours], upper[hours]
+
+
+OUTLIER_METHODS = {
+    'percentile': percentile_bounds,
+    'iqr': iqr_bounds,
+    'rolling_mad': rolling_mad_bounds,
+    'seasonal_zscore': seasonal_zscore_bounds,
+}
+DEFAULT_METHOD = 'percentile'
+
+
+def outlier_mask(values, bounds):
+    """Return True where values fall outside broadcastable (lower, upper) bounds."""
+    lower_bound, upper_bound = bounds
+    with np.errstate(invalid='ignore'):
+        return (values < lower_bound) | (values > upper_bound)
+
+
+class OutlierEngine:
+    """Outlier bounds, counts and filtered columns of one dataset."""
+
+    def __init__(self, df, max_cached_columns=64):
+        """
+        Initialize the engine.
+
+        Args:
+            df: Prepared dataframe (or LazyFrame) of the upload
+            max_cached_columns: Number of filtered columns to keep
+        """
+        self.df = df
+        self.max_cached_columns = max_cached_columns
+        self._bounds = {}
+        self._counts = {}
+        self._filtered = OrderedDict()
+        self._hours = None
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        filtered = sum(frame.memory_usage(index=False).sum() for frame in self._filtered.values())
+        return filtered + sum(
+            lower.nbytes + upper.nbytes for lower, upper in self._bounds.values()
+        ) + (self._hours.nbytes if self._hours is not None else 0)
+
+    @staticmethod
+    def _method(method):
+        if method not in OUTLIER_METHODS:
+            raise ValueError(f"Unknown outlier method: {method}")
+        return OUTLIER_METHODS[method]
+
+    def _block(self, columns):
+        """Return a dataframe of columns, materializing only those of a LazyFrame."""
+        if hasattr(self.df, 'select'):
+            return self.df.select(columns)[columns]
+        return self.df[columns]
+
+    def _compact_bounds(self, method, values):
+        """
+        Compute the bounds of a block of columns in the form they are kept.
+
+        Args:
+            method: Outlier method name
+            values: Array of shape (rows, columns)
+
+        Returns:
+            Tuple of (lower, upper) arrays with 1, 24 or one row per hour
+        """
+        if method == 'seasonal_zscore':
+            return seasonal_zscore_table(values, self.df.index)
+        lower, upper = self._method(method)(values, self.df.index)
+        return np.asarray(lower), np.asarray(upper)
+
+    def _expand(self, method, bound):
+        """Broadcast a compact bound against the rows of the frame."""
+        if method != 'seasonal_zscore':
+            return bound
+        if self._hours is None:
+            self._hours = np.asarray(self.df.index.hour)
+        return bound[self._hours]
+
+    def _keep(self, method, columns, lower, upper):
+        """Keep the bounds of columns unless they are as long as the values."""
+        if lower.shape[0] >= len(self.df.index):
+            return
+        for j, column in enumerate(columns):
+            self._bounds[(method, column)] = (lower[:, j].copy(), upper[:, j].copy())
+
+    def bounds(self, data_point, method=DEFAULT_METHOD):
+        """
+        Return the bounds of a column, broadcastable against its values.
+
+        Args:
+            data_point: Column name
+            method: Outlier method name
+
+        Returns:
+            Tuple of (lower_bound, upper_bound) arrays
+        """
+        bounds = self._bounds.get((method, data_point))
+        if bounds is None:
+            values = self.df[data_point].to_numpy(dtype=np.float64)[:, None]
+            lower, upper = self._compact_bounds(method, values)
+            self._keep(method, [data_point], lower, upper)
+            bounds = (lower[:, 0], upper[:, 0])
+        return self._expand(method, bounds[0]), self._expand(method, bounds[1])
+
+    def filter_values(self, columns, show_outliers=True, method=DEFAULT_METHOD):
+        """
+        Return the values of several columns as one aligned 2-D array.
+
+        Bounds of columns not seen before are computed in a single call of
+        the method over all of them.
+
+        Args:
+            columns: Column names, without duplicates
+            show_outliers: Boolean to show/hide outliers
+            method: Outlier method name
+
+        Returns:
+            Array of shape (rows, len(columns)), outliers set to NaN if hidden
+        """
+        columns = list(columns)
+        values = self._block(columns).to_numpy(dtype=np.float64, copy=True)
+        if show_outliers or not columns:
+            return values
+        new = [i for i, column in enumerate(columns) if (method, column) not in self._bounds]
+        computed = {}
+        if new:
+            new_columns = [columns[i] for i in new]
+            lower, upper = self._compact_bounds(method, values[:, new])
+            self._keep(method, new_columns, lower, upper)
+            computed = {column: (lower[:, j], upper[:, j]) for j, column in enumerate(new_columns)}
+        bounds = [computed.get(column) or self._bounds[(method, column)] for column in columns]
+        lower = self._expand(method, np.stack([bound[0] for bound in bounds], axis=1))
+        upper = self._expand(method, np.stack([bound[1] for bound in bounds], axis=1))
+        values[outlier_mask(values, (lower, upper))] = np.nan
+        return values
+
+    def flagged_counts(self, method=DEFAULT_METHOD):
+        """
+        Count outliers of every column, computing bounds a block of columns at a time.
+
+        The compact bounds of each block are kept, so later filtering of any
+        column with the same method reuses them.
+
+        Args:
+            method: Outlier method name
+
+        Returns:
+            Series of outlier counts indexed by column, highest first
+        """
+        counts = self._counts.get(method)
+        if counts is None:
+            columns = list(self.df.columns)
+            totals = np.zeros(len(columns), dtype=np.int64)
+            for block in range(0, len(columns), COLUMN_BLOCK):
+                block_columns = columns[block:block + COLUMN_BLOCK]
+                values = self._block(block_columns).to_numpy(dtype=np.float64)
+                lower, upper = self._compact_bounds(method, values)
+                self._keep(method, block_columns, lower, upper)
+                bounds = (self._expand(method, lower), self._expand(method, upper))
+                totals[block:block + values.shape[1]] = outlier_mask(values, bounds).sum(axis=0)
+            counts = pd.Series(totals, index=pd.Index(columns))
+            counts = counts.sort_values(ascending=False, kind='stable')
+            self._counts[method] = counts
+        return counts
+
+    def filter(self, data_point, show_outliers=True, method=DEFAULT_METHOD):
+        """
+        Return a frame holding data_point with outliers removed if requested.
+
+        Args:
+            data_point: Column name
+            show_outliers: Boolean to show/hide outliers
+            method: Outlier method name
+
+        Returns:
+            The full dataframe if show_outliers, otherwise a single-column
+            dataframe with outliers set to NaN
+        """
+        if show_outliers:
+            return self.df
+        key = (method, data_point)
+        with self._lock:
+            frame = self._filtered.get(key)
+            if frame is not None:
+                self._filtered.move_to_end(key)
+                return frame
+
+        series = self.df[data_point]
+        values = series.to_numpy(dtype=np.float64)
+        mask = outlier_mask(values, self.bounds(data_point, method))
+        frame = pd.Series(np.where(mask, np.nan, values), index=series.index,
+                          name=data_point).to_frame()
+        with self._lock:
+            self._filtered[key] = frame
+            while len(self._filtered) > self.max_cached_columns:
+                self._filtered.popitem(last=False)
+        return frame
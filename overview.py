@@ -0,0 +1,196 @@
+"""
+Site-wide overview of every meter, day by day.
+
+Daily totals, completeness and outlier counts of all columns are computed in
+one vectorized pass over the hourly value array, a block of columns at a
+time, so broken meters among thousands can be spotted on one heatmap instead
+of stepping through them with Prev/Next.
+"""
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+from utils import get_range_slice
+from outliers import OUTLIER_METHODS, DEFAULT_METHOD, COLUMN_BLOCK, outlier_mask
+
+# Heatmap metrics and their labels
+OVERVIEW_METRICS = {
+    'completeness': 'Completeness (%)',
+    'outliers': 'Outlier hours',
+    'relative_sums': 'Daily total (% of meter peak)',
+}
+DEFAULT_METRIC = 'completeness'
+
+
+class SiteOverview:
+    """Per-day tables of every column, shaped (columns, days) for heatmaps."""
+
+    def __init__(self, index, columns, sums, completeness, outliers):
+        """
+        Initialize the overview tables.
+
+        Args:
+            index: Daily DatetimeIndex
+            columns: Column names
+            sums: Float32 array of daily totals, shape (columns, days)
+            completeness: Uint8 array of the percentage of hours present
+            outliers: Uint8 array of the number of outlier hours
+        """
+        self.index = index
+        self.columns = pd.Index(columns)
+        self.sums = sums
+        self.completeness = completeness
+        self.outliers = outliers
+
+    @property
+    def nbytes(self):
+        return self.sums.nbytes + self.completeness.nbytes + self.outliers.nbytes
+
+    @property
+    def missing_days(self):
+        """Boolean array, True on days without any value of a column."""
+        return self.completeness == 0
+
+    @property
+    def relative_sums(self):
+        """
+        Daily totals as a percentage of each column's highest daily total.
+
+        Days without any value are NaN, so they stay apart from days whose
+        total is zero; columns that never consume are zero throughout.
+        """
+        sums = np.where(self.missing_days, np.nan, self.sums)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            peak = np.nanmax(np.abs(sums), axis=1, keepdims=True) if sums.size else sums
+            relative = np.where(peak > 0, 100.0 * sums / peak, np.where(np.isnan(sums), np.nan, 0.0))
+        return np.rint(relative).astype(np.float32)
+
+    def between(self, start_dt, end_dt):
+        """
+        Return the overview of the days between two datetimes.
+
+        Args:
+            start_dt: Start datetime
+            end_dt: End datetime
+
+        Returns:
+            SiteOverview of the selected days
+        """
+        days = get_range_slice(self.index, start_dt, end_dt)
+        return SiteOverview(self.index[days], self.columns, self.sums[:, days],
+                            self.completeness[:, days], self.outliers[:, days])
+
+    def table(self, metric=DEFAULT_METRIC):
+        """
+        Return the (columns, days) array of a metric.
+
+        Args:
+            metric: Key of OVERVIEW_METRICS
+
+        Returns:
+            Array of shape (columns, days)
+        """
+        if metric not in OVERVIEW_METRICS:
+            raise ValueError(f"Unknown overview metric: {metric}")
+        return getattr(self, metric)
+
+    def worst_first(self, metric=DEFAULT_METRIC):
+        """
+        Return the column positions ordered from the most to the least suspect.
+
+        Args:
+            metric: Key of OVERVIEW_METRICS
+
+        Returns:
+            Array of column positions
+        """
+        if metric == 'relative_sums':
+            # Days without consumption first, then days without data
+            return np.lexsort((
+                -np.count_nonzero(self.missing_days, axis=1),
+                -np.count_nonzero(self.relative_sums == 0, axis=1)
+            ))
+        if metric == 'outliers':
+            score = -self.outliers.sum(axis=1, dtype=np.int64)
+        else:
+            score = self.completeness.mean(axis=1)
+        return np.argsort(score, kind='stable')
+
+    def summary(self):
+        """
+        Summarize every column over the days of the overview.
+
+        Returns:
+            Dataframe indexed by column with 'completeness' (percent),
+            'outliers' (hours) and 'empty_days' columns
+        """
+        return pd.DataFrame({
+            'completeness': self.completeness.mean(axis=1),
+            'outliers': self.outliers.sum(axis=1, dtype=np.int64),
+            'empty_days': np.count_nonzero(self.missing_days, axis=1)
+        }, index=self.columns)
+
+
+def compute_site_overview(df, method=DEFAULT_METHOD, block_size=COLUMN_BLOCK):
+    """
+    Compute daily totals, completeness and outlier counts of all columns.
+
+    Args:
+        df: Prepared hourly dataframe (or LazyFrame) with sorted index
+        method: Outlier method name
+        block_size: Number of columns read and reduced at a time
+
+    Returns:
+        SiteOverview instance
+    """
+    bounds_func = OUTLIER_METHODS[method]
+    columns = list(df.columns)
+    if len(df.index) == 0:
+        empty = np.zeros((len(columns), 0), dtype=np.uint8)
+        return SiteOverview(pd.DatetimeIndex([], freq='D'), columns,
+                            empty.astype(np.float32), empty, empty)
+
+    days = df.index.normalize()
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    index = pd.DatetimeIndex(days[starts])
+    hours = np.diff(np.r_[starts, len(days)])[:, None]
+
+    sums = np.empty((len(columns), len(index)), dtype=np.float32)
+    completeness = np.empty((len(columns), len(index)), dtype=np.uint8)
+    outliers = np.empty((len(columns), len(index)), dtype=np.uint8)
+    for block in range(0, len(columns), block_size):
+        block_columns = columns[block:block + block_size]
+        if hasattr(df, 'select'):
+            values = df.select(block_columns)[block_columns].to_numpy(dtype=np.float64)
+        else:
+            values = df[block_columns].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        flagged = outlier_mask(values, bounds_func(values, df.index))
+        rows = slice(block, block + values.shape[1])
+        sums[rows] = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0).T
+        counts = np.add.reduceat(valid, starts, axis=0, dtype=np.int32)
+        completeness[rows] = np.rint(100.0 * counts / hours).T
+        outliers[rows] = np.add.reduceat(flagged, starts, axis=0, dtype=np.int32).T
+    return SiteOverview(index, columns, sums, completeness, outliers)
+
+
+overview_cache = LRUCache(max_entries=8, max_bytes=256 * 1024 ** 2)
+
+
+def load_site_overview(dataset, method=DEFAULT_METHOD):
+    """
+    Return the overview of a dataset, computing it once per method.
+
+    Args:
+        dataset: Dataset from cache.load_dataset
+        method: Outlier method name
+
+    Returns:
+        SiteOverview instance
+    """
+    key = (dataset.key, method)
+    overview = overview_cache.get(key)
+    if overview is None:
+        overview = compute_site_overview(dataset.df, method)
+        overview_cache.put(key, overview)
+    return overview
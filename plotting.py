@@ -1,11 +1,240 @@
 """
 Chart generation and plotting functions using Plotly.
 """
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 
+from utils import get_range_slice
 
-def create_single_data_chart(df_plot, data_point, unit, start_dt, end_dt):
+DEFAULT_SCREEN_WIDTH = 1200
+# Page padding, axis titles and legend around the plot area
+CHART_MARGIN_PIXELS = 250
+MIN_TARGET_POINTS = 200
+POINTS_PER_PIXEL = 1
+DOWNSAMPLE_METHODS = ('minmax', 'lttb')
+SCATTERGL_THRESHOLD = 5000
+MAX_SERIES = 20
+AXIS_SPACING = 0.06
+OVERVIEW_ROW_PIXELS = 14
+OVERVIEW_MAX_HEIGHT = 1600
+SERIES_COLORS = (
+    '#1f77b4', 'orange', '#2ca02c', '#d62728', '#9467bd',
+    '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'
+)
+
+
+def get_target_points(screen_width):
+    """
+    Get the number of points worth sending to the browser for one trace.
+    
+    About one point per pixel of the plot area: the chart spans the window
+    less the page padding, axis titles and legend.
+    
+    Args:
+        screen_width: Browser window width in pixels, or None if unknown
+        
+    Returns:
+        Target number of points
+    """
+    width = screen_width if screen_width else DEFAULT_SCREEN_WIDTH
+    return max(MIN_TARGET_POINTS, int((width - CHART_MARGIN_PIXELS) * POINTS_PER_PIXEL))
+
+
+def _finite_runs(y):
+    """Return (start, stop) pairs of the runs of finite values in y."""
+    finite = np.isfinite(y)
+    edges = np.diff(np.concatenate(([0], finite.view(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def _minmax_run(y, n_out):
+    """Indices of the minimum and maximum of each bucket of a finite run."""
+    n_buckets = max(1, n_out // 2)
+    size = -(-len(y) // n_buckets)
+    n_buckets = -(-len(y) // size)
+    pad = n_buckets * size - len(y)
+    low = np.concatenate((y, np.full(pad, np.inf))).reshape(n_buckets, size)
+    high = np.concatenate((y, np.full(pad, -np.inf))).reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    return np.concatenate((
+        [0, len(y) - 1], offsets + low.argmin(axis=1), offsets + high.argmax(axis=1)
+    ))
+
+
+def _bucket_extremes(y, n_buckets):
+    """
+    Indices of the extremes and first missing value of each bucket of y.
+    
+    Used when gaps split a trace into more runs than the point budget allows:
+    short runs within a bucket are merged, and a bucket holding a gap still
+    keeps one missing value so the line breaks there.
+    """
+    n = len(y)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    pad = n_buckets * size - n
+    finite = np.concatenate((np.isfinite(y), np.zeros(pad, dtype=bool))).reshape(n_buckets, size)
+    missing = np.concatenate((~np.isfinite(y), np.zeros(pad, dtype=bool))).reshape(n_buckets, size)
+    padded = np.concatenate((y, np.full(pad, np.nan))).reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    has_values = finite.any(axis=1)
+    has_gap = missing.any(axis=1)
+    low = np.where(finite, padded, np.inf).argmin(axis=1)
+    high = np.where(finite, padded, -np.inf).argmax(axis=1)
+    return np.concatenate((
+        (offsets + low)[has_values], (offsets + high)[has_values],
+        (offsets + missing.argmax(axis=1))[has_gap]
+    ))
+
+
+def _lttb_run(x, y, n_out):
+    """Largest-Triangle-Three-Buckets indices of a finite run."""
+    n = len(y)
+    every = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    indices[-1] = n - 1
+    return indices
+
+
+def downsample_indices(x, y, max_points, method='minmax'):
+    """
+    Choose the points of a trace to keep when drawing it at max_points.
+    
+    Gaps are preserved: each run of finite values is downsampled on its own,
+    with a budget proportional to its length, and the first missing value
+    after each run is kept so the line still breaks there. When there are too
+    many runs for the budget, the trace is bucketed as a whole instead, short
+    runs merging within a bucket. At most max_points positions are returned.
+    
+    Args:
+        x: Numeric x values (e.g. epoch nanoseconds), sorted
+        y: Float y values, NaN for missing data
+        max_points: Target number of points
+        method: 'minmax' (keep bucket extremes) or 'lttb'
+        
+    Returns:
+        Sorted array of positions into x and y
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    n = len(y)
+    if max_points is None or n <= max_points:
+        return np.arange(n)
+
+    runs = _finite_runs(y)
+    # Every run needs its two end points and the missing value after it
+    if 3 * len(runs) + 1 > max_points:
+        return np.unique(_bucket_extremes(y, max(1, max_points // 3)).astype(np.int64))
+
+    n_finite = sum(stop - start for start, stop in runs)
+    spare = max_points - 3 * len(runs) - 1
+    keep = [np.flatnonzero(~np.isfinite(y[:1]))]
+    for start, stop in runs:
+        length = stop - start
+        n_out = 2 + int(spare * length / n_finite)
+        if length <= n_out:
+            run_indices = np.arange(length)
+        elif n_out < 4:
+            run_indices = np.array([0, length - 1])
+        elif method == 'lttb':
+            run_indices = _lttb_run(x[start:stop], y[start:stop], n_out)
+        else:
+            # First and last points plus two per bucket
+            run_indices = _minmax_run(y[start:stop], n_out - 2)
+        keep.append(start + run_indices)
+        if stop < n:
+            keep.append([stop])
+    return np.unique(np.concatenate(keep).astype(np.int64))
+
+
+def downsample_trace(x, y, max_points, method='minmax'):
+    """
+    Downsample an hourly trace for display.
+    
+    Args:
+        x: DatetimeIndex of the trace
+        y: Series or array of values aligned with x
+        max_points: Target number of points, None for full resolution
+        method: 'minmax' or 'lttb'
+        
+    Returns:
+        Tuple of (x, y) with at most about max_points points
+    """
+    if max_points is None or len(y) <= max_points:
+        return x, y
+    values = np.asarray(y, dtype=np.float64)
+    keep = downsample_indices(x.asi8.astype(np.float64), values, max_points, method)
+    return x[keep], (y.iloc[keep] if isinstance(y, pd.Series) else values[keep])
+
+
+def _epoch_ms(index):
+    """Convert a DatetimeIndex to epoch milliseconds."""
+    return pd.DatetimeIndex(index).as_unit('ms').asi8
+
+
+def make_trace(x, y, fast=True, y_dtype=np.float32, **props):
+    """
+    Build a scatter trace.
+    
+    The fast path returns a plain trace dict holding NumPy arrays (epoch-ms x
+    values and y_dtype y values) and switches to WebGL for long traces. The
+    slow path returns a validated go.Scatter built from the inputs as given.
+    
+    Args:
+        x: DatetimeIndex of the trace
+        y: Values aligned with x
+        fast: Whether to build a plain dict trace
+        y_dtype: Dtype of y values in the fast path
+        **props: Other trace properties (mode, name, line, yaxis, ...)
+        
+    Returns:
+        Trace dict or go.Scatter
+    """
+    if not fast:
+        return go.Scatter(x=x, y=y, **props)
+    y = np.asarray(y, dtype=y_dtype)
+    trace_type = 'scattergl' if len(y) > SCATTERGL_THRESHOLD else 'scatter'
+    return dict(type=trace_type, x=_epoch_ms(x), y=y, **props)
+
+
+def make_figure(traces, layout, fast=True):
+    """
+    Assemble a figure from traces and a layout dict.
+    
+    Args:
+        traces: Traces built by make_trace
+        layout: Layout dict
+        fast: Whether to skip Plotly's per-property validation
+        
+    Returns:
+        Plotly figure object
+    """
+    if fast:
+        layout = dict(layout, xaxis=dict(layout.get('xaxis', {}), type='date'))
+        return go.Figure(dict(data=traces, layout=layout), _validate=False)
+    fig = go.Figure()
+    for trace in traces:
+        fig.add_trace(trace)
+    fig.update_layout(**layout)
+    return fig
+
+
+def create_single_data_chart(df_plot, data_point, unit, start_dt, end_dt, daily=None,
+                             max_points=None, downsample_method='minmax', fast=True):
     """
     Create a chart with single data point showing hourly, daily, and EMA data.
     
@@ -15,31 +244,42 @@ def create_single_data_chart(df_plot, data_point, unit, start_dt, end_dt):
         unit: Unit string for labels
         start_dt: Start datetime
         end_dt: End datetime
+        daily: Optional precomputed daily aggregates of data_point with
+            'sum' and 'ema' columns; computed from df_plot if omitted
+        max_points: Downsample the hourly trace to about this many points
+        downsample_method: 'minmax' or 'lttb'
+        fast: Build the figure from NumPy arrays without validation
         
     Returns:
         Plotly figure object
     """
-    time_range = (df_plot.index >= start_dt) & (df_plot.index <= end_dt)
-    fig = go.Figure()
+    rows = get_range_slice(df_plot.index, start_dt, end_dt)
+    traces = []
     
     # Add hourly data trace
-    fig.add_trace(go.Scatter(
-        x=df_plot.index[time_range],
-        y=df_plot[data_point][time_range],
+    x, y = downsample_trace(
+        df_plot.index[rows], df_plot[data_point].iloc[rows], max_points, downsample_method
+    )
+    traces.append(make_trace(
+        x, y, fast,
         mode='lines',
         name='Hourly Data',
-        yaxis='y1'
+        yaxis='y'
     ))
     
     # Add daily total trace
-    df_daily = df_plot[data_point].resample('D').sum()
-    date_range = (df_daily.index >= start_dt) & (df_daily.index <= end_dt)
+    if daily is None:
+        daily_sum = df_plot[data_point].resample('D').sum()
+        daily_ema = daily_sum.ewm(span=7, adjust=False).mean()
+    else:
+        daily_sum = daily['sum']
+        daily_ema = daily['ema']
+    days = get_range_slice(daily_sum.index, start_dt, end_dt)
     # Shift display daily total to end of day
-    df_daily.index = df_daily.index + pd.Timedelta(hours=23, minutes=59)
+    daily_x = daily_sum.index[days] + pd.Timedelta(hours=23, minutes=59)
     
-    fig.add_trace(go.Scatter(
-        x=df_daily.index[date_range],
-        y=df_daily.values[date_range],
+    traces.append(make_trace(
+        daily_x, daily_sum.values[days], fast, np.float64,
         mode='lines+markers',
         name='Daily Total',
         line=dict(color='red', width=2, dash='dot'),
@@ -48,10 +288,8 @@ def create_single_data_chart(df_plot, data_point, unit, start_dt, end_dt):
     ))
     
     # Add 7-day EMA trace
-    df_ema = df_daily.ewm(span=7, adjust=False).mean()
-    fig.add_trace(go.Scatter(
-        x=df_ema.index[date_range],
-        y=df_ema.values[date_range],
+    traces.append(make_trace(
+        daily_x, daily_ema.values[days], fast, np.float64,
         mode='lines',
         name='7-Day EMA',
         line=dict(color='green', width=2, dash='solid'),
@@ -59,20 +297,19 @@ def create_single_data_chart(df_plot, data_point, unit, start_dt, end_dt):
     ))
     
     # Update layout
-    fig.update_layout(
-        xaxis=dict(title="Date"),
+    layout = dict(
+        xaxis=dict(title=dict(text="Date")),
         yaxis=dict(
-            title=f"Hourly {unit}",
+            title=dict(text=f"Hourly {unit}"),
             side='left',
             showgrid=True
         ),
         yaxis2=dict(
-            title=f"Daily Total {unit}",
+            title=dict(text=f"Daily Total {unit}", font=dict(color='red')),
             overlaying='y',
             side='right',
             showgrid=False,
-            tickfont=dict(color='red'),
-            titlefont=dict(color='red')
+            tickfont=dict(color='red')
         ),
         legend=dict(
             x=1.1,
@@ -84,77 +321,116 @@ def create_single_data_chart(df_plot, data_point, unit, start_dt, end_dt):
         )
     )
     
-    return fig
+    return make_figure(traces, layout, fast)
 
 
-def create_comparison_chart(df_plot, data_point, unit, data_desc,
-                           df_plot_1, data_point_1, unit_1, data_desc_1,
-                           start_dt, end_dt, same_y_axis=False):
+def create_multi_series_chart(index, values, series, start_dt, end_dt,
+                              max_points=None, downsample_method='minmax', fast=True):
     """
-    Create a chart comparing two data points.
+    Create a chart comparing any number of data points.
+    
+    The columns of values share one time index, so the date range is sliced
+    once for all series. Series are grouped on y-axes by their axis key; the
+    first axis is on the left and every further axis on the right.
     
     Args:
-        df_plot: First dataframe
-        data_point: First data column
-        unit: First data unit
-        data_desc: First data description
-        df_plot_1: Second dataframe
-        data_point_1: Second data column
-        unit_1: Second data unit
-        data_desc_1: Second data description
+        index: DatetimeIndex shared by all series
+        values: Array of shape (len(index), len(series))
+        series: List of dictionaries with data_desc, unit and axis keys
         start_dt: Start datetime
         end_dt: End datetime
-        same_y_axis: Whether to use same y-axis for both datasets
+        max_points: Downsample each trace to about this many points
+        downsample_method: 'minmax' or 'lttb'
+        fast: Build the figure from NumPy arrays without validation
         
     Returns:
         Plotly figure object
     """
-    time_range = (df_plot.index >= start_dt) & (df_plot.index <= end_dt)
-    fig = go.Figure()
+    rows = get_range_slice(index, start_dt, end_dt)
+    x_index = index[rows]
+    values = values[rows]
     
-    # Add first data trace
-    fig.add_trace(go.Scatter(
-        x=df_plot.index[time_range],
-        y=df_plot[data_point][time_range],
-        mode='lines',
-        name=data_desc,
-        yaxis='y1'
-    ))
-    
-    # Add second data trace
-    fig.add_trace(go.Scatter(
-        x=df_plot_1.index[time_range],
-        y=df_plot_1[data_point_1][time_range],
-        mode='lines',
-        name=data_desc_1,
-        line=dict(color='orange', width=2, dash='solid'),
-        yaxis='y1' if same_y_axis else 'y2'
-    ))
+    axes = {}
+    traces = []
+    for i, info in enumerate(series):
+        color = SERIES_COLORS[i % len(SERIES_COLORS)]
+        axis = axes.setdefault(info.get('axis', info['unit']), {
+            'name': 'y' if not axes else f'y{len(axes) + 1}',
+            'unit': info['unit'],
+            'color': color
+        })
+        x, y = downsample_trace(x_index, values[:, i], max_points, downsample_method)
+        traces.append(make_trace(
+            x, y, fast,
+            mode='lines',
+            name=info['data_desc'],
+            line=dict(color=color, width=2),
+            yaxis=axis['name']
+        ))
     
-    # Update layout
-    fig.update_layout(
-        xaxis=dict(title="Date"),
-        yaxis=dict(
-            title=unit,
-            side='left',
-            showgrid=True
-        ),
-        yaxis2=dict(
-            title=unit_1,
-            overlaying='y',
-            side='right',
-            showgrid=False,
-            tickfont=dict(color='orange'),
-            titlefont=dict(color='orange')
-        ),
+    # Extra right-hand axes are stacked outside a narrowed plot area
+    n_right = max(len(axes) - 1, 0)
+    x_end = 1.0 - AXIS_SPACING * max(n_right - 1, 0)
+    layout = dict(
+        xaxis=dict(title=dict(text="Date"), domain=[0, x_end]),
         legend=dict(
-            x=1.1,
-            y=1,
-            xanchor='left',
+            orientation='h',
+            x=0,
+            y=1.02,
+            yanchor='bottom',
             bgcolor='rgba(255,255,255,0.5)',
             bordercolor='gray',
             borderwidth=1
         )
     )
+    for j, axis in enumerate(axes.values()):
+        title = dict(text=axis['unit'])
+        if j == 0:
+            layout['yaxis'] = dict(title=title, side='left', showgrid=True)
+            continue
+        title['font'] = dict(color=axis['color'])
+        layout[f"yaxis{j + 1}"] = dict(
+            title=title,
+            overlaying='y',
+            side='right',
+            showgrid=False,
+            tickfont=dict(color=axis['color']),
+            anchor='x' if j == 1 else 'free',
+            position=min(x_end + AXIS_SPACING * (j - 1), 1.0)
+        )
     
-    return fig
\ No newline at end of file
+    return make_figure(traces, layout, fast)
+
+
+def create_overview_heatmap(days, labels, z, title, fast=True):
+    """
+    Create a meter x day heatmap of one overview metric.
+    
+    Args:
+        days: Daily DatetimeIndex
+        labels: Unique row labels, one per meter
+        z: Array of shape (len(labels), len(days)), NaN for no data
+        title: Colorbar title
+        fast: Build the figure from NumPy arrays without validation
+        
+    Returns:
+        Plotly figure object
+    """
+    days = pd.DatetimeIndex(days)
+    trace = dict(
+        type='heatmap',
+        x=_epoch_ms(days) if fast else days,
+        y=list(labels),
+        z=np.asarray(z),
+        colorscale='Viridis',
+        colorbar=dict(title=dict(text=title)),
+        hovertemplate='%{y}<br>%{x|%Y-%m-%d}: %{z}<extra></extra>'
+    )
+    height = min(max(400, OVERVIEW_ROW_PIXELS * len(labels) + 150), OVERVIEW_MAX_HEIGHT)
+    layout = dict(
+        xaxis=dict(title=dict(text="Date")),
+        yaxis=dict(autorange='reversed', showticklabels=len(labels) * OVERVIEW_ROW_PIXELS <= height),
+        height=height,
+        margin=dict(l=10, r=10, t=30, b=40)
+    )
+    return make_figure([trace if fast else go.Heatmap(**trace)], layout, fast)
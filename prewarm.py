@@ -0,0 +1,107 @@
+"""
+Background pre-warming of single data point charts.
+
+After a chart is rendered, the charts of the neighbouring data points of the
+same site and data type are built on a small thread pool into the figure
+cache, so Prev/Next steps find their figure ready instead of filtering,
+resampling and building it during the rerun.
+
+The number of neighbours warmed on each side is set by the DASHBOARD_PREWARM
+environment variable (default 1, 0 disables pre-warming).
+"""
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from figure_cache import CachedFigure, figure_cache
+
+PREWARM_ENV = 'DASHBOARD_PREWARM'
+DEFAULT_NEIGHBOURS = 1
+PREWARM_WORKERS = 2
+
+
+def prewarm_neighbours():
+    """
+    Return the number of neighbours to warm on each side of a data point.
+
+    A value that is not an integer is ignored with a warning, and negative
+    values disable pre-warming.
+
+    Returns:
+        Non-negative number of neighbours
+    """
+    value = os.environ.get(PREWARM_ENV)
+    if not value:
+        return DEFAULT_NEIGHBOURS
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        warnings.warn(f"Ignoring {PREWARM_ENV}: expected an integer, got {value!r}",
+                      RuntimeWarning)
+        return DEFAULT_NEIGHBOURS
+
+
+def neighbour_positions(position, count, depth):
+    """
+    Return the positions around position, nearest first, wrapping around.
+
+    Args:
+        position: Current position
+        count: Number of items in the list
+        depth: Neighbours on each side
+
+    Returns:
+        List of positions, without position itself
+    """
+    positions = []
+    for step in range(1, depth + 1):
+        for candidate in ((position + step) % count, (position - step) % count):
+            if candidate != position and candidate not in positions:
+                positions.append(candidate)
+    return positions
+
+
+class ChartPrewarmer:
+    """Builds figures on a thread pool into a figure cache."""
+
+    def __init__(self, cache=figure_cache, max_workers=PREWARM_WORKERS):
+        """
+        Initialize the prewarmer.
+
+        Args:
+            cache: LRUCache receiving CachedFigure entries
+            max_workers: Number of background threads
+        """
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='chart-prewarm')
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, key, build):
+        """
+        Build a figure in the background unless it is cached or pending.
+
+        Args:
+            key: Figure key
+            build: Function returning the figure
+        """
+        with self._lock:
+            if key in self.cache or key in self._pending:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._run, key, build)
+
+    def _run(self, key, build):
+        try:
+            self.cache.put(key, CachedFigure(build()))
+        except Exception:
+            # Speculative work: the foreground rerun reports real errors
+            pass
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+
+prewarmer = ChartPrewarmer()
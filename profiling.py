@@ -0,0 +1,217 @@
+"""
+Lightweight per-stage timing of dashboard reruns.
+
+A rerun is opened with start_rerun and closed with finish_rerun; in between,
+code wrapped in the stage context manager (or the profiled decorator) records
+its wall time, and optionally its peak traced memory, into the rerun's
+profile. Stages may nest. When profiling is disabled, stages cost one
+thread-local lookup.
+
+The traced peak is process-wide, so memory is only measured while a single
+profiled rerun is running; stages overlapping another rerun have no peak.
+
+Configuration:
+    DASHBOARD_PROFILE: '1' records timings, 'memory' also records the peak
+        memory allocated in each stage (via tracemalloc, which slows the app)
+    DASHBOARD_PROFILE_FILE: Optional JSONL file receiving one line per rerun
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_ENV = 'DASHBOARD_PROFILE'
+PROFILE_FILE_ENV = 'DASHBOARD_PROFILE_FILE'
+
+_local = threading.local()
+_file_lock = threading.Lock()
+_reruns_lock = threading.Lock()
+_active_reruns = []
+
+
+def profile_mode():
+    """
+    Read the profiling mode from the environment.
+
+    Returns:
+        None when disabled, 'time' or 'memory'
+    """
+    value = os.environ.get(PROFILE_ENV, '').lower()
+    if value == 'memory':
+        return 'memory'
+    if value in ('1', 'true', 'yes', 'time'):
+        return 'time'
+    return None
+
+
+class RerunProfile:
+    """Stage timings of one rerun."""
+
+    def __init__(self, label='', track_memory=False):
+        """
+        Initialize the profile.
+
+        Args:
+            label: Free-form label of the rerun (e.g. the site name)
+            track_memory: Whether to record peak memory per stage; it is
+                measured while measuring_memory stays True
+        """
+        self.label = label
+        self.track_memory = track_memory
+        self.measuring_memory = track_memory
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.total_seconds = None
+        self.stages = []
+        self._stack = []
+
+    def enter(self, name):
+        """Start a stage and return its record."""
+        record = dict(stage=name, depth=len(self._stack), seconds=None)
+        if self.track_memory:
+            record['peak_bytes'] = None
+        if self.measuring_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['_peak'] = max(self._stack[-1]['_peak'], peak)
+            tracemalloc.reset_peak()
+            record.update(_start=current, _peak=current)
+        self.stages.append(record)
+        self._stack.append(record)
+        record['_t0'] = time.perf_counter()
+        return record
+
+    def exit(self, record):
+        """Finish a stage started by enter."""
+        record['seconds'] = time.perf_counter() - record.pop('_t0')
+        self._stack.pop()
+        if '_start' not in record:
+            return
+        start, peak = record.pop('_start'), record.pop('_peak')
+        if not self.measuring_memory:
+            # Another rerun ran during the stage, so its peak is unknown
+            return
+        peak = max(tracemalloc.get_traced_memory()[1], peak)
+        record['peak_bytes'] = peak - start
+        if self._stack:
+            self._stack[-1]['_peak'] = max(self._stack[-1]['_peak'], peak)
+
+    def finish(self):
+        """Close the rerun and record its total wall time."""
+        while self._stack:
+            self.exit(self._stack[-1])
+        self.total_seconds = time.perf_counter() - self.started
+
+    def to_dict(self):
+        """Return a JSON-serializable record of the rerun."""
+        return dict(time=self.started_at.isoformat(timespec='milliseconds'), label=self.label,
+                    total_seconds=self.total_seconds, stages=self.stages)
+
+
+def current_profile():
+    """Return the profile of the rerun running in this thread, or None."""
+    return getattr(_local, 'profile', None)
+
+
+def start_rerun(label=''):
+    """
+    Start profiling a rerun in this thread if profiling is enabled.
+
+    Args:
+        label: Free-form label of the rerun
+
+    Returns:
+        RerunProfile instance, or None when profiling is disabled
+    """
+    _unregister(current_profile())
+    mode = profile_mode()
+    if mode is None:
+        _local.profile = None
+        return None
+    track_memory = mode == 'memory'
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    profile = _local.profile = RerunProfile(label, track_memory)
+    if track_memory:
+        with _reruns_lock:
+            # Overlapping reruns would reset and read each other's peak
+            if _active_reruns:
+                for other in _active_reruns + [profile]:
+                    other.measuring_memory = False
+            _active_reruns.append(profile)
+    return profile
+
+
+def _unregister(profile):
+    with _reruns_lock:
+        if profile in _active_reruns:
+            _active_reruns.remove(profile)
+
+
+def set_rerun_label(label):
+    """Set the label of the rerun running in this thread, if profiled."""
+    profile = current_profile()
+    if profile is not None:
+        profile.label = label
+
+
+def finish_rerun():
+    """
+    Finish the rerun of this thread and append it to the JSONL file if set.
+
+    Returns:
+        The finished RerunProfile, or None when profiling is disabled
+    """
+    profile = current_profile()
+    _local.profile = None
+    if profile is None:
+        return None
+    profile.finish()
+    _unregister(profile)
+    path = os.environ.get(PROFILE_FILE_ENV)
+    if path:
+        line = json.dumps(profile.to_dict())
+        with _file_lock, open(path, 'a') as f:
+            f.write(line + '\n')
+    return profile
+
+
+@contextmanager
+def stage(name):
+    """
+    Record the wall time (and peak memory) of a block in the current rerun.
+
+    Args:
+        name: Stage name
+    """
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    record = profile.enter(name)
+    try:
+        yield
+    finally:
+        profile.exit(record)
+
+
+def profiled(name=None):
+    """
+    Decorate a function so each call is recorded as a stage.
+
+    Args:
+        name: Stage name, defaults to the function's qualified name
+    """
+    def decorator(func):
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,199 @@
+"""
+Process-wide registry of the datasets open in browser sessions.
+
+Sessions viewing the same export hold leases on one shared Dataset. While a
+dataset has leases it stays registered, whatever the LRU caches evict, so a
+reload of the same upload by another session never parses a second copy.
+Registered frames and index arrays are made read-only, so no session can
+change the data others see. A lease is released explicitly when its session
+switches to another export, or when the session state holding it is garbage
+collected.
+"""
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+
+
+def read_only_frame(df):
+    """
+    Return a frame over the same values as df whose values are read-only.
+
+    A frame of a single dtype is rebuilt over its value array; frames mixing
+    dtypes (text cells read by the legacy parser) are rebuilt column by
+    column, so every column keeps its dtype.
+
+    Args:
+        df: Prepared dataframe
+
+    Returns:
+        Dataframe with the same index, columns and dtypes, or df itself when
+        its values are already read-only
+    """
+    if df.dtypes.nunique() <= 1:
+        values = df.to_numpy()
+        if not values.flags.writeable:
+            return df
+        values.flags.writeable = False
+        return pd.DataFrame(values, index=df.index, columns=df.columns, copy=False)
+
+    arrays = [df.iloc[:, i].to_numpy() for i in range(df.shape[1])]
+    if not any(values.flags.writeable for values in arrays):
+        return df
+    for values in arrays:
+        values.flags.writeable = False
+    frozen = pd.DataFrame(dict(enumerate(arrays)), index=df.index, copy=False)
+    frozen.columns = df.columns
+    return frozen
+
+
+def freeze_dataset(dataset):
+    """
+    Make the frame and index arrays of a dataset read-only.
+
+    The frame is replaced by a read-only frame over the same values, also in
+    the dataset's outlier engine.
+
+    Args:
+        dataset: Dataset whose frame and precomputed indexes are frozen
+    """
+    if isinstance(dataset.df, pd.DataFrame):
+        frozen = read_only_frame(dataset.df)
+        if dataset.outliers is not None and dataset.outliers.df is dataset.df:
+            dataset.outliers.df = frozen
+        dataset.df = frozen
+    for index in (dataset.aggregates, dataset.gap_index):
+        for value in vars(index).values() if index is not None else ():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+
+
+class DatasetLease:
+    """A session's claim on a registered dataset."""
+
+    def __init__(self, registry, dataset):
+        """
+        Initialize the lease; use DatasetRegistry.acquire instead.
+
+        Args:
+            registry: DatasetRegistry holding the dataset
+            dataset: The shared Dataset
+        """
+        self.dataset = dataset
+        self.key = dataset.key
+        self._finalizer = weakref.finalize(self, registry._release, dataset.key)
+
+    @property
+    def released(self):
+        return not self._finalizer.alive
+
+    def release(self):
+        """Give up the claim on the dataset; calling it again has no effect."""
+        self._finalizer()
+
+
+class DatasetRegistry:
+    """Reference-counted datasets keyed by upload content hash."""
+
+    def __init__(self):
+        self._entries = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Return the registered dataset of a key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def refcount(self, key):
+        """Return the number of leases held on a key."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else 0
+
+    @property
+    def nbytes(self):
+        """Memory of the registered frames in bytes."""
+        with self._lock:
+            datasets = [entry[0] for entry in self._entries.values()]
+        return sum(dataset.df.nbytes if hasattr(dataset.df, 'nbytes')
+                   else int(dataset.df.memory_usage(index=True).sum()) for dataset in datasets)
+
+    def get_or_load(self, key, loader):
+        """
+        Return the registered dataset of a key, or load and register it once.
+
+        Concurrent loads of the same key wait for the first one, which
+        registers its result before the others look it up again.
+
+        Args:
+            key: Content hash of the dataset
+            loader: Function returning the Dataset when it is not registered
+
+        Returns:
+            Dataset instance
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            dataset = self.get(key)
+            if dataset is None:
+                dataset = self._register(loader())
+        with self._lock:
+            self._loading.pop(key, None)
+        return dataset
+
+    def acquire(self, dataset):
+        """
+        Register a dataset, or take the one already registered under its key.
+
+        Args:
+            dataset: Dataset to share
+
+        Returns:
+            DatasetLease whose dataset is the shared instance
+        """
+        with self._lock:
+            entry = self._entry(dataset)
+            entry[1] += 1
+            return DatasetLease(self, entry[0])
+
+    def _register(self, dataset):
+        """Register a dataset without a lease and return the registered one."""
+        with self._lock:
+            return self._entry(dataset)[0]
+
+    def _entry(self, dataset):
+        # Called with self._lock held
+        entry = self._entries.get(dataset.key)
+        if entry is None:
+            freeze_dataset(dataset)
+            entry = self._entries[dataset.key] = [dataset, 0]
+        return entry
+
+    def _release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._entries[key]
+
+    def clear(self):
+        """Forget all datasets; outstanding leases are released as no-ops."""
+        with self._lock:
+            self._entries.clear()
+
+
+dataset_registry = DatasetRegistry()
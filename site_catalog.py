@@ -0,0 +1,126 @@
+"""
+Flattened, indexed view of the sites configuration.
+
+The sites JSON maps site -> data type -> data point description -> column name.
+SiteCatalog flattens it once per uploaded file so every lookup the UI and the
+solar check perform is a dictionary access instead of a DataFrame traversal.
+"""
+import pandas as pd
+
+from utils import get_keys, get_entity_id, get_unit_from_data_point
+
+
+class SiteCatalog:
+    """Indexed site / data type / data point lookups."""
+
+    def __init__(self, sites_dict):
+        """
+        Build the catalog.
+
+        Args:
+            sites_dict: Dictionary of site -> data type -> description -> column
+        """
+        self._sites = tuple(sites_dict.keys())
+        self._types = {}
+        self._descs = {}
+        self._columns = {}
+        self._positions = {}
+        self._locations = {}
+        self.units = {}
+        self.entity_ids = {}
+
+        for site, site_types in sites_dict.items():
+            types = tuple(get_keys(site_types)) if isinstance(site_types, dict) else ()
+            self._types[site] = types
+            for data_type in types:
+                points = site_types[data_type]
+                if not isinstance(points, dict):
+                    continue
+                descs = tuple(points.keys())
+                self._descs[(site, data_type)] = descs
+                self._columns[(site, data_type)] = tuple(points.values())
+                self._positions[(site, data_type)] = {desc: i for i, desc in enumerate(descs)}
+                for desc, column in points.items():
+                    self._locations.setdefault(column, (site, data_type, desc))
+                    if column not in self.units:
+                        self.units[column] = get_unit_from_data_point(column)
+                        self.entity_ids[column] = get_entity_id(column)
+
+    @classmethod
+    def from_sites(cls, sites):
+        """
+        Build a catalog from the sites dataframe or dictionary.
+
+        Args:
+            sites: Sites dataframe (as read by pd.read_json) or dictionary
+
+        Returns:
+            SiteCatalog instance
+        """
+        if isinstance(sites, pd.DataFrame):
+            sites = sites.to_dict()
+        return cls(sites)
+
+    def site_names(self):
+        """Return the site names in file order."""
+        return self._sites
+
+    def data_types(self, site):
+        """Return the data types available for a site."""
+        return self._types.get(site, ())
+
+    def data_descs(self, site, data_type):
+        """Return the ordered data point descriptions of a site and type."""
+        return self._descs.get((site, data_type), ())
+
+    def data_columns(self, site, data_type):
+        """Return the ordered column names of a site and type."""
+        return self._columns.get((site, data_type), ())
+
+    def position(self, site, data_type, data_desc):
+        """Return the position of a data point within its site and type."""
+        return self._positions[(site, data_type)][data_desc]
+
+    def data_point(self, site, data_type, data_desc):
+        """Return the column name of a data point."""
+        return self._columns[(site, data_type)][self.position(site, data_type, data_desc)]
+
+    def locate(self, column):
+        """Return (site, data_type, data_desc) for a column name, or None."""
+        return self._locations.get(column)
+
+    def unit(self, column):
+        """Return the unit of a column."""
+        unit = self.units.get(column)
+        return unit if unit is not None else get_unit_from_data_point(column)
+
+    def entity_id(self, column):
+        """Return the entity ID of a column."""
+        if column in self.entity_ids:
+            return self.entity_ids[column]
+        return get_entity_id(column)
+
+    def find(self, search_str, data_type=None):
+        """
+        Find data points whose description contains a string.
+
+        Args:
+            search_str: Lower-case string to search for
+            data_type: Optional data type to restrict the search to
+
+        Returns:
+            List of dictionaries with site, type, name and index keys
+        """
+        points = []
+        for (site, point_type), descs in self._descs.items():
+            if data_type is not None and point_type != data_type:
+                continue
+            columns = self._columns[(site, point_type)]
+            for desc, column in zip(descs, columns):
+                if search_str in desc.lower():
+                    points.append({"site": site, "type": point_type, "name": desc, "index": column})
+        return points
+
+    def solar_energy_points(self):
+        """Return the solar data points of type Energy."""
+        return self.find("solar", "Energy")
@@ -0,0 +1,164 @@
+"""
+Batch health check of solar meters.
+
+The solar Energy columns are resolved once per sites file. Each check then
+slices the final day of the 2-D value array and sums all solar columns in a
+single NumPy reduction, comparing the totals against per-site thresholds.
+
+Per-site thresholds can be configured with the DASHBOARD_SOLAR_THRESHOLDS
+environment variable as a JSON object, e.g. '{"Main": 25}'.
+"""
+import json
+import math
+import os
+import warnings
+import numpy as np
+import pandas as pd
+
+from utils import get_solar_energy_points
+
+DEFAULT_THRESHOLD = 10
+THRESHOLDS_ENV = 'DASHBOARD_SOLAR_THRESHOLDS'
+
+
+def get_configured_thresholds():
+    """
+    Read per-site thresholds from the environment.
+
+    A value that is not a JSON object of site names to finite numbers is
+    ignored with a warning, and the default threshold applies to all sites.
+
+    Returns:
+        Dictionary of site name to threshold
+    """
+    value = os.environ.get(THRESHOLDS_ENV)
+    if not value:
+        return {}
+    try:
+        thresholds = json.loads(value)
+    except ValueError as e:
+        warnings.warn(f"Ignoring {THRESHOLDS_ENV}: invalid JSON ({e})", RuntimeWarning)
+        return {}
+    if not isinstance(thresholds, dict) or not all(
+        isinstance(threshold, (int, float)) and not isinstance(threshold, bool)
+        and math.isfinite(threshold)
+        for threshold in thresholds.values()
+    ):
+        warnings.warn(f"Ignoring {THRESHOLDS_ENV}: expected an object of site names to numbers",
+                      RuntimeWarning)
+        return {}
+    return thresholds
+
+
+class SolarHealthCheck:
+    """Flags solar points whose last-day total is at or below a threshold."""
+
+    def __init__(self, points, thresholds=None, default_threshold=DEFAULT_THRESHOLD):
+        """
+        Initialize the check.
+
+        Args:
+            points: Solar Energy data points as returned by get_solar_energy_points
+            thresholds: Optional dictionary of site name to threshold
+            default_threshold: Threshold for sites without their own value
+        """
+        thresholds = thresholds or {}
+        self.points = list(points)
+        self.columns = pd.Index([p["index"] for p in self.points])
+        self.thresholds = np.array(
+            [thresholds.get(p["site"], default_threshold) for p in self.points], dtype=np.float64
+        )
+
+    @classmethod
+    def from_sites(cls, sites_dict, thresholds=None, default_threshold=DEFAULT_THRESHOLD):
+        """
+        Build the check from a sites dictionary.
+
+        Args:
+            sites_dict: Dictionary containing site information
+            thresholds: Optional dictionary of site name to threshold
+            default_threshold: Threshold for sites without their own value
+
+        Returns:
+            SolarHealthCheck instance
+        """
+        return cls(get_solar_energy_points(sites_dict), thresholds, default_threshold)
+
+    @classmethod
+    def from_catalog(cls, catalog, thresholds=None, default_threshold=DEFAULT_THRESHOLD):
+        """
+        Build the check from a SiteCatalog.
+
+        Args:
+            catalog: SiteCatalog instance
+            thresholds: Optional dictionary of site name to threshold
+            default_threshold: Threshold for sites without their own value
+
+        Returns:
+            SolarHealthCheck instance
+        """
+        return cls(catalog.solar_energy_points(), thresholds, default_threshold)
+
+    def last_day_totals(self, df, aggregates=None):
+        """
+        Compute the total of the last day for every solar column.
+
+        Args:
+            df: Hourly dataframe sorted by time
+            aggregates: Optional precomputed DailyAggregates of df
+
+        Returns:
+            Array of totals, NaN for columns missing from the data
+        """
+        totals = np.full(len(self.columns), np.nan)
+        if len(df.index) == 0:
+            return totals
+
+        if aggregates is not None:
+            positions = aggregates.columns.get_indexer(self.columns)
+            present = positions >= 0
+            if len(aggregates.index) > 0:
+                totals[present] = aggregates.sums[-1, positions[present]]
+            missing = ~present
+        else:
+            missing = np.ones(len(self.columns), dtype=bool)
+
+        positions = df.columns.get_indexer(self.columns)
+        missing &= positions >= 0
+        if missing.any():
+            last_day = df.index[-1].normalize()
+            start = df.index.searchsorted(last_day)
+            values = df.iloc[start:, positions[missing]].to_numpy(dtype=np.float64)
+            totals[missing] = np.nansum(values, axis=0)
+        return totals
+
+    def run(self, df, aggregates=None):
+        """
+        Find solar points with a low total on the last day.
+
+        Args:
+            df: Hourly dataframe sorted by time
+            aggregates: Optional precomputed DailyAggregates of df
+
+        Returns:
+            List of problematic solar data points
+        """
+        totals = self.last_day_totals(df, aggregates)
+        flagged = np.flatnonzero(totals <= self.thresholds)
+        return [self.points[i] for i in flagged]
+
+
+def check_solar_data_issues(sites_dict, df, aggregates=None, thresholds=None):
+    """
+    Check for solar data points with very low daily totals.
+
+    Args:
+        sites_dict: Dictionary containing site information
+        df: Dataframe with energy data
+        aggregates: Optional precomputed DailyAggregates of df
+        thresholds: Optional dictionary of site name to threshold
+
+    Returns:
+        List of problematic solar data points
+    """
+    return SolarHealthCheck.from_sites(sites_dict, thresholds).run(df, aggregates)
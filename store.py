@@ -0,0 +1,133 @@
+"""
+Optional on-disk columnar store for prepared data.
+
+Prepared frames (the output of prepare_dataframe) are written as uncompressed
+Feather files, or Parquet, keyed by site name and end date. Feather files are
+memory-mapped on reload so only the requested columns are touched.
+
+The store is enabled by setting the DASHBOARD_STORE_DIR environment variable;
+DASHBOARD_STORE_FORMAT selects 'feather' (default) or 'parquet'.
+"""
+import os
+import re
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+STORE_DIR_ENV = 'DASHBOARD_STORE_DIR'
+STORE_FORMAT_ENV = 'DASHBOARD_STORE_FORMAT'
+TIME_COLUMN = 'time'
+CONTENT_KEY_META = b'dashboard.content_key'
+
+
+def _safe_name(name):
+    """Make a string safe to use as a file or directory name."""
+    return re.sub(r'[^\w.-]', '_', str(name))
+
+
+class ColumnStore:
+    """Columnar on-disk store of prepared dataframes."""
+
+    def __init__(self, root, file_format='feather'):
+        """
+        Initialize the store.
+
+        Args:
+            root: Root directory of the store
+            file_format: 'feather' or 'parquet'
+        """
+        if file_format not in ('feather', 'parquet'):
+            raise ValueError(f"Unsupported store format: {file_format}")
+        self.root = root
+        self.file_format = file_format
+
+    def path(self, site_name, end_date_str):
+        """Return the file path for a site and end date."""
+        return os.path.join(
+            self.root, _safe_name(site_name), f"{_safe_name(end_date_str)}.{self.file_format}"
+        )
+
+    def exists(self, site_name, end_date_str):
+        """Check whether a frame is stored for a site and end date."""
+        return os.path.exists(self.path(site_name, end_date_str))
+
+    def save(self, site_name, end_date_str, df, content_key=None):
+        """
+        Write a prepared dataframe to the store.
+
+        Args:
+            site_name: Name of the site
+            end_date_str: End date string in format MMDDYYYY
+            df: Dataframe with datetime index
+            content_key: Optional hash of the source upload
+        """
+        path = self.path(site_name, end_date_str)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        table = pa.Table.from_pandas(df.rename_axis(TIME_COLUMN).reset_index(), preserve_index=False)
+        if content_key is not None:
+            metadata = dict(table.schema.metadata or {})
+            metadata[CONTENT_KEY_META] = content_key.encode()
+            table = table.replace_schema_metadata(metadata)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if self.file_format == 'feather':
+            feather.write_feather(table, tmp_path, compression='uncompressed')
+        else:
+            pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _schema(self, path):
+        if self.file_format == 'feather':
+            with pa.memory_map(path) as source:
+                return pa.ipc.open_file(source).schema
+        return pq.read_schema(path)
+
+    def columns(self, site_name, end_date_str):
+        """Return the stored data column names without reading any values."""
+        names = self._schema(self.path(site_name, end_date_str)).names
+        return [name for name in names if name != TIME_COLUMN]
+
+    def content_key(self, site_name, end_date_str):
+        """Return the content hash recorded when the frame was stored, if any."""
+        metadata = self._schema(self.path(site_name, end_date_str)).metadata or {}
+        value = metadata.get(CONTENT_KEY_META)
+        return value.decode() if value is not None else None
+
+    def load(self, site_name, end_date_str, columns=None):
+        """
+        Read a stored dataframe, optionally only a subset of its columns.
+
+        Args:
+            site_name: Name of the site
+            end_date_str: End date string in format MMDDYYYY
+            columns: Optional list of data columns to read
+
+        Returns:
+            Dataframe with datetime index
+        """
+        path = self.path(site_name, end_date_str)
+        read_columns = None if columns is None else [TIME_COLUMN] + list(columns)
+        if self.file_format == 'feather':
+            table = feather.read_table(path, columns=read_columns, memory_map=True)
+        else:
+            table = pq.read_table(path, columns=read_columns, memory_map=True)
+
+        df = table.to_pandas(split_blocks=True)
+        index = pd.DatetimeIndex(df.pop(TIME_COLUMN).to_numpy())
+        df.index = pd.DatetimeIndex(index, freq=pd.infer_freq(index) if len(index) > 2 else None)
+        return df
+
+
+def get_store():
+    """
+    Return the configured on-disk store, or None if it is disabled.
+
+    Returns:
+        ColumnStore or None
+    """
+    root = os.environ.get(STORE_DIR_ENV)
+    if not root:
+        return None
+    return ColumnStore(root, os.environ.get(STORE_FORMAT_ENV, 'feather'))
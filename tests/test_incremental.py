@@ -0,0 +1,46 @@
+"""Tests of the incremental rolling store."""
+import numpy as np
+import pandas as pd
+
+from incremental import RollingStore
+from ingest import read_data_file
+from utils import prepare_dataframe
+from benchmarks.synthetic import make_frame, to_export
+
+COLUMNS = ['_1001_1', '_1002_1', '_1003_2']
+
+
+def test_later_update_leaves_earlier_frame_unchanged():
+    first_export = to_export(make_frame(COLUMNS, '03152025', history_days=0, seed=1))
+    # A corrected export of the same window, with changed values and Mar 10-14 missing
+    later = make_frame(COLUMNS, '03152025', history_days=0, seed=2)
+    later_export = to_export(later[later.index < '2025-03-10'])
+
+    store = RollingStore()
+    first = store.update('Main', first_export, '03152025')
+    snapshot = first.copy()
+    second = store.update('Main', later_export, '03152025')
+
+    pd.testing.assert_frame_equal(first, snapshot)
+    expected = prepare_dataframe(read_data_file(first_export), '03152025')
+    np.testing.assert_array_equal(first.to_numpy(), expected.to_numpy())
+    assert second.loc['2025-03-10':].isna().all().all()
+    assert not np.shares_memory(first.to_numpy(), second.to_numpy())
+
+
+def test_export_with_text_cell_falls_back_to_default_path():
+    export = to_export(make_frame(COLUMNS, '03152025', history_days=0, seed=1))
+    lines = export.split(b'\n')
+    fields = lines[5].split(b',')
+    fields[1] = b'err'
+    lines[5] = b','.join(fields)
+    export = b'\n'.join(lines)
+
+    store = RollingStore()
+    df = store.update('Main', export, '03152025')
+    expected = prepare_dataframe(read_data_file(export), '03152025')
+    pd.testing.assert_frame_equal(df, expected)
+
+    clean = to_export(make_frame(COLUMNS, '03152025', history_days=0, seed=2))
+    pd.testing.assert_frame_equal(store.update('Main', clean, '03152025'),
+                                  prepare_dataframe(read_data_file(clean), '03152025'))
@@ -0,0 +1,31 @@
+"""Tests of the outlier engine."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from outliers import OUTLIER_METHODS, OutlierEngine, outlier_mask
+
+
+def make_frame(columns=12, days=30):
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2025-03-01', periods=days * 24, freq='h')
+    values = rng.normal(size=(len(index), columns))
+    values[rng.random(values.shape) < 0.02] *= 20
+    values[rng.random(values.shape) < 0.05] = np.nan
+    return pd.DataFrame(values, index=index, columns=[f'_{1000 + i}_1' for i in range(columns)])
+
+
+@pytest.mark.parametrize('method', list(OUTLIER_METHODS))
+def test_kept_bounds_are_compact_and_match_the_method(method):
+    df = make_frame()
+    engine = OutlierEngine(df)
+    counts = engine.flagged_counts(method)
+
+    values = df.to_numpy()
+    expected = outlier_mask(values, OUTLIER_METHODS[method](values, df.index)).sum(axis=0)
+    assert (counts[df.columns].to_numpy() == expected).all()
+    # At most an hour-of-day table per column is kept, never one bound per hour
+    assert engine.nbytes < values.nbytes / 4
+
+    filtered = engine.filter_values(list(df.columns[:3]), show_outliers=False, method=method)
+    assert np.count_nonzero(np.isnan(filtered) & ~np.isnan(values[:, :3])) == expected[:3].sum()
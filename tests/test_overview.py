@@ -0,0 +1,40 @@
+"""Tests of the site overview."""
+import numpy as np
+import pandas as pd
+
+from overview import compute_site_overview
+
+COLUMNS = ['_1001_1', '_1002_1', '_1003_1']
+
+
+def make_hourly(days=10):
+    index = pd.date_range('2025-03-01', periods=days * 24, freq='h')
+    return pd.DataFrame(np.ones((len(index), len(COLUMNS))), index=index, columns=COLUMNS)
+
+
+def test_missing_days_stay_apart_from_zero_days():
+    df = make_hourly()
+    df.loc['2025-03-02', '_1001_1'] = np.nan
+    df.loc['2025-03-03', '_1002_1'] = 0.0
+    overview = compute_site_overview(df)
+
+    relative = overview.relative_sums
+    assert np.isnan(relative[0, 1]) and relative[1, 2] == 0
+    assert np.count_nonzero(relative[0] == 0) == 0
+    # The meter that stopped consuming ranks first, the one without data next
+    assert list(overview.worst_first('relative_sums')[:2]) == [1, 0]
+
+
+def test_ranking_and_summary_use_selected_days():
+    df = make_hourly()
+    df.loc['2025-03-09':'2025-03-10', '_1003_1'] = np.nan
+    df.loc['2025-03-01', '_1002_1'] = np.nan
+    overview = compute_site_overview(df)
+
+    assert overview.worst_first('completeness')[0] == 2
+    selected = overview.between(pd.Timestamp('2025-03-01'), pd.Timestamp('2025-03-05'))
+    assert len(selected.index) == 5
+    assert selected.worst_first('completeness')[0] == 1
+    summary = selected.summary()
+    assert summary.loc['_1003_1', 'completeness'] == 100
+    assert summary.loc['_1002_1', 'empty_days'] == 1
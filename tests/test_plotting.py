@@ -0,0 +1,34 @@
+"""Tests of chart downsampling."""
+import numpy as np
+import pytest
+
+from plotting import downsample_indices, get_target_points
+
+DEFAULT_WINDOW_ROWS = 92 * 24
+
+
+def gappy_series(n, gap_rate, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.normal(size=n).cumsum()
+    y[rng.random(n) < gap_rate] = np.nan
+    return np.arange(n, dtype=np.float64), y
+
+
+def test_default_target_downsamples_default_window():
+    assert get_target_points(None) < DEFAULT_WINDOW_ROWS
+
+
+@pytest.mark.parametrize('gap_rate', [0.0, 0.01, 0.05, 0.2, 0.5])
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+@pytest.mark.parametrize('max_points', [get_target_points(None), 300])
+def test_gap_heavy_series_respects_budget(gap_rate, method, max_points):
+    x, y = gappy_series(DEFAULT_WINDOW_ROWS, gap_rate)
+    keep = downsample_indices(x, y, max_points, method)
+
+    assert len(keep) <= max_points
+    assert np.all(np.diff(keep) > 0)
+    kept = y[keep]
+    if method == 'minmax':
+        assert np.nanmax(kept) == np.nanmax(y) and np.nanmin(kept) == np.nanmin(y)
+    # Lines still break at gaps
+    assert np.isnan(kept).any() == np.isnan(y).any()
@@ -0,0 +1,40 @@
+"""Tests of the rerun profiler."""
+import threading
+
+import profiling
+
+
+def test_overlapping_reruns_do_not_report_peak_memory(monkeypatch):
+    monkeypatch.setenv(profiling.PROFILE_ENV, 'memory')
+    started, overlapped = threading.Event(), threading.Event()
+    profiles = {}
+
+    def first_rerun():
+        profiling.start_rerun()
+        with profiling.stage('alone'):
+            bytearray(10 ** 6)
+        started.set()
+        overlapped.wait()
+        with profiling.stage('overlapping'):
+            bytearray(10 ** 6)
+        profiles['first'] = profiling.finish_rerun()
+
+    thread = threading.Thread(target=first_rerun)
+    thread.start()
+    started.wait()
+    profiling.start_rerun()
+    overlapped.set()
+    with profiling.stage('second'):
+        bytearray(10 ** 6)
+    profiles['second'] = profiling.finish_rerun()
+    thread.join()
+
+    alone, overlapping = profiles['first'].stages
+    assert alone['peak_bytes'] >= 10 ** 6
+    assert overlapping['peak_bytes'] is None
+    assert profiles['second'].stages[0]['peak_bytes'] is None
+
+    profiling.start_rerun()
+    with profiling.stage('single'):
+        bytearray(10 ** 6)
+    assert profiling.finish_rerun().stages[0]['peak_bytes'] >= 10 ** 6
@@ -0,0 +1,68 @@
+"""Tests of the shared dataset registry."""
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache import Dataset
+from outliers import OutlierEngine
+from registry import DatasetRegistry
+
+
+def make_dataset(key='k'):
+    index = pd.date_range('2025-03-01', periods=48, freq='h')
+    df = pd.DataFrame(np.random.rand(len(index), 3), index=index, columns=['a', 'b', 'c'])
+    return Dataset(key, df, outliers=OutlierEngine(df))
+
+
+def test_concurrent_opens_share_one_load():
+    registry = DatasetRegistry()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return make_dataset()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get_or_load('k', loader)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(dataset is results[0] for dataset in results)
+    lease = registry.acquire(results[0])
+    assert lease.dataset is results[0] and registry.refcount('k') == 1
+
+
+def test_registered_frame_is_read_only_and_shared():
+    dataset = make_dataset()
+    values = dataset.df.to_numpy()
+    shared = DatasetRegistry().acquire(dataset).dataset
+
+    assert np.shares_memory(shared.df.to_numpy(), values)
+    assert shared.outliers.df is shared.df
+    with pytest.raises(ValueError):
+        shared.df.iloc[0, 0] = 1.0
+    with pytest.raises(ValueError):
+        shared.df['a'].to_numpy()[0] = 1.0
+
+
+def test_mixed_dtype_frame_keeps_its_dtypes():
+    dataset = make_dataset()
+    dataset.df['a'] = dataset.df['a'].astype(object)
+    dataset.df.iloc[0, 0] = 'err'
+    dtypes = dataset.df.dtypes.to_dict()
+    values = dataset.df['b'].to_numpy()
+    shared = DatasetRegistry().acquire(dataset).dataset
+
+    assert shared.df.dtypes.to_dict() == dtypes
+    assert np.shares_memory(shared.df['b'].to_numpy(), values)
+    with pytest.raises(ValueError):
+        shared.df.iloc[1, 1] = 1.0
+    with pytest.raises(ValueError):
+        shared.df['a'].to_numpy()[1] = 1.0
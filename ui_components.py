@@ -2,8 +2,13 @@
 Streamlit UI components and display functions.
 """
 import streamlit as st
-from datetime import datetime
-from utils import get_keys, get_entity_id, get_unit_from_data_point
+import pandas as pd
+
+from outliers import OUTLIER_METHODS, DEFAULT_METHOD
+from overview import OVERVIEW_METRICS, DEFAULT_METRIC
+from plotting import MAX_SERIES
+
+VIEWS = ("Data points", "Site overview")
 
 
 def setup_page_config():
@@ -48,6 +53,16 @@ def create_file_upload_section(screen_width):
     return site_info, data_file
 
 
+def create_view_selection():
+    """
+    Create the switch between the data point charts and the site overview.
+    
+    Returns:
+        Selected entry of VIEWS
+    """
+    return st.radio("View", VIEWS, horizontal=True, key='view', label_visibility="collapsed")
+
+
 def create_header_section(site_name, df, streamlit_version):
     """
     Create header section with title and reset button.
@@ -109,23 +124,70 @@ def create_date_selection_section(site_name, df):
 
 def create_control_section():
     """
-    Create control section with outliers checkbox and data point toggle.
+    Create control section with outliers checkbox, data point toggle, outlier
+    method, resolution toggle and noisy meter ranking toggle.
     
     Returns:
-        Boolean for show_outliers
+        Tuple of (show_outliers, outlier_method, full_resolution, rank_outliers)
     """
-    col1, col2, col3 = st.columns([1, 2, 6])
+    col1, col2, col3, col4, col5 = st.columns([1, 2, 2, 2, 2])
     
     with col1:
         show_outliers = st.checkbox("Show Outliers", value=True)
     
     with col2:
-        if 'show_data_1' in st.session_state and st.session_state.show_data_1:
-            st.button("Hide data point 1", on_click=hide_data_1)
-        else:
-            st.button("Add another data point", on_click=show_data_1)
+        extra_points = st.session_state.get('extra_points', 0)
+        if extra_points + 1 < MAX_SERIES:
+            st.button("Add another data point", on_click=add_data_point)
+        if extra_points > 0:
+            st.button(f"Hide data point {extra_points}", on_click=remove_data_point)
+    
+    with col3:
+        methods = list(OUTLIER_METHODS)
+        outlier_method = st.selectbox(
+            "Outlier method", methods, index=methods.index(DEFAULT_METHOD),
+            key='outlier_method', label_visibility="collapsed"
+        )
+    
+    with col4:
+        full_resolution = st.checkbox(
+            "Full resolution", value=False,
+            help="Send every hourly point to the chart instead of a downsampled trace"
+        )
     
-    return show_outliers
+    with col5:
+        rank_outliers = st.checkbox(
+            "Rank noisy meters", value=False,
+            help="List the data points with the most outliers for the selected method"
+        )
+    
+    return show_outliers, outlier_method, full_resolution, rank_outliers
+
+
+def create_overview_controls():
+    """
+    Create the metric and outlier method selection of the site overview.
+    
+    Returns:
+        Tuple of (metric, outlier_method)
+    """
+    col1, col2, col3 = st.columns([2, 2, 4])
+    
+    with col1:
+        metrics = list(OVERVIEW_METRICS)
+        metric = st.selectbox(
+            "Metric", metrics, index=metrics.index(DEFAULT_METRIC),
+            format_func=OVERVIEW_METRICS.get, key='overview_metric'
+        )
+    
+    with col2:
+        methods = list(OUTLIER_METHODS)
+        outlier_method = st.selectbox(
+            "Outlier method", methods, index=methods.index(DEFAULT_METHOD),
+            key='overview_method'
+        )
+    
+    return metric, outlier_method
 
 
 def create_data_selection_section(sites, key_suffix="", show_same_y_axis_option=False, ref_unit=""):
@@ -133,7 +195,7 @@ def create_data_selection_section(sites, key_suffix="", show_same_y_axis_option=
     Create data selection dropdowns.
     
     Args:
-        sites: Sites dictionary
+        sites: SiteCatalog of the sites configuration
         key_suffix: Suffix for unique keys
         
     Returns:
@@ -158,7 +220,7 @@ def create_data_selection_section(sites, key_suffix="", show_same_y_axis_option=
     
     with col1:
         site = st.selectbox(f"Site{' ' + key_suffix if key_suffix else ''}", 
-                           list(sites.keys()), 
+                           sites.site_names(), 
                            key=site_key)
         if st.session_state[prev_site_key] != site:
             st.session_state[index_key] = 0
@@ -167,20 +229,20 @@ def create_data_selection_section(sites, key_suffix="", show_same_y_axis_option=
         
     with col2:
         data_type = st.selectbox(f"Data Type{' ' + key_suffix if key_suffix else ''}", 
-                               get_keys(sites[site]), 
+                               sites.data_types(site), 
                                key=type_key)
         if st.session_state[prev_type_key] != data_type:
             st.session_state[index_key] = 0
             st.session_state[prev_type_key] = data_type
     with col3:
-        data_keys = list(sites[site][data_type].keys())
+        data_keys = sites.data_descs(site, data_type)
         data_key_count = len(data_keys)
         data_desc = st.selectbox(f"Data Point{' ' + key_suffix if key_suffix else ''}", 
                                data_keys,
                                index=st.session_state[index_key],
                                key=f"data_desc{key_suffix}")
         if data_desc != data_keys[st.session_state[index_key]]:
-            st.session_state[index_key] = data_keys.index(data_desc)
+            st.session_state[index_key] = sites.position(site, data_type, data_desc)
 
     with col4:
         st.markdown(
@@ -201,13 +263,13 @@ def create_data_selection_section(sites, key_suffix="", show_same_y_axis_option=
             st.rerun()
 
     with col6:
-        data_point = sites[site][data_type][data_desc]
-        entity_id = get_entity_id(data_point)
+        data_point = sites.data_point(site, data_type, data_desc)
+        entity_id = sites.entity_id(data_point)
         if entity_id:
             st.write(f"Entity ID: {entity_id}")
-        unit = get_unit_from_data_point(data_point)
+        unit = sites.unit(data_point)
         if show_same_y_axis_option and ref_unit == unit:
-            same_y_axis = st.checkbox("Use same y-axis", value=True)
+            same_y_axis = st.checkbox("Use same y-axis", value=True, key=f"same_y_axis{key_suffix}")
         else:
             same_y_axis = False
     
@@ -230,26 +292,117 @@ def display_solar_issues(problematic_points):
             )
 
 
-def display_missing_data(missing_data):
+def display_missing_data(gaps):
     """
-    Display missing data timestamps in a grid layout.
+    Display missing data as a table of gap ranges.
     
     Args:
-        missing_data: List of missing data timestamps
+        gaps: Dataframe with start, end and hours columns, one row per gap
     """
-    if missing_data:
-        st.subheader(f"Time of missing data ({len(missing_data)})")
-        cols_per_row = 7
-        
-        for i in range(0, len(missing_data), cols_per_row):
-            cols = st.columns(cols_per_row)
-            for j in range(cols_per_row):
-                if i + j < len(missing_data):
-                    dt_obj = datetime.strptime(str(missing_data[i + j]), "%Y-%m-%d %H:%M:%S")
-                    cols[j].markdown(
-                        f"<div class='row-spacing'>{dt_obj.strftime('%m/%d/%y %I:%M %p')}</div>",
-                        unsafe_allow_html=True
-                    )
+    missing_count = int(gaps['hours'].sum())
+    if missing_count > 0:
+        st.subheader(f"Time of missing data ({missing_count})")
+        labels = pd.DatetimeIndex(
+            pd.concat([gaps['start'], gaps['end']], ignore_index=True)
+        ).strftime('%m/%d/%y %I:%M %p')
+        st.dataframe(
+            pd.DataFrame({
+                'From': labels[:len(gaps)],
+                'To': labels[len(gaps):],
+                'Hours': gaps['hours'].to_numpy()
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+
+
+def display_noisy_meters(counts, sites, limit=20):
+    """
+    Display the data points with the most outliers.
+    
+    Args:
+        counts: Series of outlier counts indexed by column, highest first
+        sites: SiteCatalog used to describe the columns
+        limit: Maximum number of rows to show
+    """
+    counts = counts[counts > 0].head(limit)
+    if counts.empty:
+        return
+    locations = [sites.locate(column) or ("", "", column) for column in counts.index]
+    st.subheader("Noisy meters")
+    st.dataframe(
+        pd.DataFrame({
+            'Site': [location[0] for location in locations],
+            'Data Type': [location[1] for location in locations],
+            'Data Point': [location[2] for location in locations],
+            'Outliers': counts.to_numpy()
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+
+
+def display_overview_summary(summary, sites, limit=20):
+    """
+    Display the least complete data points of the site overview.
+    
+    Args:
+        summary: Dataframe from SiteOverview.summary, indexed by column
+        sites: SiteCatalog used to describe the columns
+        limit: Maximum number of rows to show
+    """
+    summary = summary[summary['completeness'] < 100].sort_values(
+        'completeness', kind='stable'
+    ).head(limit)
+    if summary.empty:
+        return
+    locations = [sites.locate(column) or ("", "", column) for column in summary.index]
+    st.subheader("Least complete meters")
+    st.dataframe(
+        pd.DataFrame({
+            'Site': [location[0] for location in locations],
+            'Data Type': [location[1] for location in locations],
+            'Data Point': [location[2] for location in locations],
+            'Completeness %': summary['completeness'].round(1).to_numpy(),
+            'Empty days': summary['empty_days'].to_numpy(),
+            'Outliers': summary['outliers'].to_numpy()
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+
+
+def display_profile(profile, caches=None, registry=None):
+    """
+    Display the stage timings of the current rerun in a collapsed panel.
+    
+    Args:
+        profile: Finished RerunProfile
+        caches: Optional dictionary of name to LRUCache whose counters are shown
+        registry: Optional DatasetRegistry whose shared datasets are shown
+    """
+    with st.expander(f"Debug: rerun took {profile.total_seconds * 1000:.0f} ms"):
+        rows = pd.DataFrame(profile.stages)
+        table = pd.DataFrame({
+            'Stage': ['\u2003' * depth + name for depth, name in zip(rows['depth'], rows['stage'])],
+            'ms': (rows['seconds'] * 1000).round(1)
+        }) if len(rows) else pd.DataFrame(columns=['Stage', 'ms'])
+        if profile.track_memory and len(rows):
+            table['Peak MiB'] = (pd.to_numeric(rows['peak_bytes']) / 1024 ** 2).round(2)
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        if profile.track_memory and not profile.measuring_memory:
+            st.caption("Peak memory is not measured in stages that overlapped another rerun.")
+        if caches:
+            st.dataframe(pd.DataFrame({
+                'Cache': list(caches),
+                'Entries': [len(cache) for cache in caches.values()],
+                'MiB': [round(cache.total_bytes / 1024 ** 2, 2) for cache in caches.values()],
+                'Hits': [cache.hits for cache in caches.values()],
+                'Misses': [cache.misses for cache in caches.values()]
+            }), hide_index=True, use_container_width=True)
+        if registry is not None:
+            st.caption(f"Shared datasets: {len(registry)} registered, "
+                       f"{registry.nbytes / 1024 ** 2:.2f} MiB")
 
 
 # Session state management functions
@@ -260,11 +413,11 @@ def reset_date(start_date, end_date):
     st.rerun()
 
 
-def show_data_1():
-    """Enable second data point display."""
-    st.session_state.show_data_1 = True
+def add_data_point():
+    """Add another data point to the comparison."""
+    st.session_state.extra_points = min(st.session_state.get('extra_points', 0) + 1, MAX_SERIES - 1)
 
 
-def hide_data_1():
-    """Disable second data point display."""
-    st.session_state.show_data_1 = False
\ No newline at end of file
+def remove_data_point():
+    """Remove the last data point from the comparison."""
+    st.session_state.extra_points = max(st.session_state.get('extra_points', 0) - 1, 0)
\ No newline at end of file
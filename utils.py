@@ -91,36 +91,106 @@ def is_last_day_of_month(dt: datetime) -> bool:
     last_day = calendar.monthrange(dt.year, dt.month)[1]
     return dt.day == last_day
 
-def prepare_dataframe(df, end_date_str):
+def get_time_range(end_date_str):
     """
-    Prepare dataframe with proper time range and missing data handling.
+    Get the hourly time range covered by an export.
     
     Args:
-        df: Input dataframe with datetime index
         end_date_str: End date string in format MMDDYYYY
         
     Returns:
-        Reindexed dataframe with full time range
+        Tuple of (start_time, end_time) datetime objects
     """
-    df = df.sort_index()
-    
     end_time_obj = datetime.strptime(end_date_str, "%m%d%Y").replace(hour=23, minute=0) - timedelta(days=1)
     if is_last_day_of_month(end_time_obj):
         start_time_obj = end_time_obj.replace(day=1) - relativedelta(months=1)
     else:
         start_time_obj = end_time_obj.replace(day=1) - relativedelta(months=2)
     start_time_obj = start_time_obj.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start_time_obj, end_time_obj
+
+
+def get_range_slice(index, start_dt, end_dt):
+    """
+    Get the positions of an index between two times, both inclusive.
+    
+    Uses a binary search on sorted indexes, so slicing with the result is
+    zero-copy; unsorted indexes fall back to a boolean mask.
     
+    Args:
+        index: DatetimeIndex, normally sorted
+        start_dt: First time to include
+        end_dt: Last time to include
+        
+    Returns:
+        Slice for sorted indexes, otherwise an array of positions
+    """
+    if index.is_monotonic_increasing:
+        return slice(index.searchsorted(start_dt, side='left'),
+                     index.searchsorted(end_dt, side='right'))
+    return np.flatnonzero((index >= start_dt) & (index <= end_dt))
+
+
+def prepare_dataframe(df, end_date_str):
+    """
+    Prepare dataframe with proper time range and missing data handling.
+    
+    Args:
+        df: Input dataframe with datetime index
+        end_date_str: End date string in format MMDDYYYY
+        
+    Returns:
+        Reindexed dataframe with full time range
+    """
+    df = df.sort_index()
+    
+    start_time_obj, end_time_obj = get_time_range(end_date_str)
     full_range = pd.date_range(start=start_time_obj, end=end_time_obj, freq='h')
     df_reindexed = df.reindex(full_range)
     
     return df_reindexed
 
 
+def get_outlier_bounds(series):
+    """
+    Get the outlier fence of a column from its 10th and 90th percentiles.
+    
+    Args:
+        series: Column values
+        
+    Returns:
+        Tuple of (lower_bound, upper_bound)
+    """
+    q1 = series.quantile(0.10)
+    q3 = series.quantile(0.90)
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def mask_outliers(series, bounds=None):
+    """
+    Set values outside the outlier bounds to NaN.
+    
+    Args:
+        series: Column values
+        bounds: Optional precomputed (lower_bound, upper_bound)
+        
+    Returns:
+        New series with outliers replaced by NaN
+    """
+    lower_bound, upper_bound = bounds if bounds is not None else get_outlier_bounds(series)
+    values = series.to_numpy(dtype=np.float64)
+    mask = (values < lower_bound) | (values > upper_bound)
+    return pd.Series(np.where(mask, np.nan, values), index=series.index, name=series.name)
+
+
 def filter_outliers(df, data_point, show_outliers=True):
     """
     Filter outliers from dataframe using IQR method.
     
+    Only the data_point column is copied; the returned frame holds just that
+    column when outliers are removed.
+    
     Args:
         df: Input dataframe
         data_point: Column name to filter
@@ -132,17 +202,7 @@ def filter_outliers(df, data_point, show_outliers=True):
     if show_outliers:
         return df
     
-    df_filtered = df.copy()
-    q1 = df[data_point].quantile(0.10)
-    q3 = df[data_point].quantile(0.90)
-    iqr = q3 - q1
-    lower_bound = q1 - 1.5 * iqr
-    upper_bound = q3 + 1.5 * iqr
-    
-    mask = (df_filtered[data_point] < lower_bound) | (df_filtered[data_point] > upper_bound)
-    df_filtered.loc[mask, data_point] = np.nan
-    
-    return df_filtered
+    return mask_outliers(df[data_point]).to_frame()
 
 
 def get_missing_data_timestamps(df, data_point):
@@ -154,29 +214,46 @@ def get_missing_data_timestamps(df, data_point):
         data_point: Column name to check
         
     Returns:
-        List of datetime objects where data is missing
+        DatetimeIndex of timestamps where data is missing
     """
-    return list(df[df[data_point].isnull()].index)
+    return df.index[df[data_point].isnull().to_numpy()]
 
 
-def check_solar_data_issues(sites_dict, df):
+def get_missing_data_gaps(missing_data, freq='h'):
     """
-    Check for solar data points with very low daily totals.
+    Collapse consecutive missing timestamps into gap ranges.
     
     Args:
-        sites_dict: Dictionary containing site information
-        df: Dataframe with energy data
+        missing_data: Sorted timestamps where data is missing
+        freq: Spacing of consecutive timestamps
         
     Returns:
-        List of problematic solar data points
+        Dataframe with start, end and hours columns, one row per gap
     """
-    solar_check = find_data_points(sites_dict, "solar")
-    problematic_points = []
-    
-    for s in solar_check:
-        if s["type"] == "Energy" and s["index"] in df.columns:
-            solar_daily_data = df[s["index"]].resample('D').sum()
-            if len(solar_daily_data) > 0 and solar_daily_data.iloc[-1] <= 10:
-                problematic_points.append(s)
+    missing = pd.DatetimeIndex(missing_data)
+    step = pd.Timedelta(1, unit=freq).value
+    if len(missing) == 0:
+        starts = ends = np.array([], dtype=np.int64)
+    else:
+        breaks = np.flatnonzero(np.diff(missing.asi8) != step) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [len(missing)])) - 1
+    return pd.DataFrame({
+        'start': missing[starts],
+        'end': missing[ends],
+        'hours': ends - starts + 1
+    })
+
+
+def get_solar_energy_points(sites_dict):
+    """
+    Get the solar data points of type Energy.
     
-    return problematic_points
\ No newline at end of file
+    Args:
+        sites_dict: Dictionary containing site information
+        
+    Returns:
+        List of solar Energy data points
+    """
+    return [s for s in find_data_points(sites_dict, "solar") if s["type"] == "Energy"]
+